@@ -0,0 +1,176 @@
+"""_shard: parallel --jobs mode for mw_trim_revisions.
+
+Pages are independent, so a dump can be cut into byte ranges that end on a
+``</page>`` boundary and trimmed by separate worker processes. Each worker
+parses its range wrapped in the dump's own root start tag and a synthetic
+close tag, writes the trimmed pages to a part file, and the main process
+stitches the result together:
+
+  prolog (declaration, root tag, siteinfo) + part 1 + ... + part N + epilog
+
+The prolog and epilog are copied from the input verbatim. Only plain,
+seekable input files can be sharded; the caller falls back to serial mode
+for stdin and gzip input.
+"""
+from __future__ import annotations
+
+import io
+import mmap
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+from typing import BinaryIO, List, Optional, Tuple
+
+import mw_trim_revisions as trim
+
+# First start tag name in the document; '<?' and '<!' constructs are skipped
+# by root_start_tag before this is applied.
+_TAG_NAME_RE = re.compile(rb'<([^\s/>!?]+)')
+
+
+def root_start_tag(mm: mmap.mmap) -> Tuple[int, int, bytes]:
+    """Return (start, end, qname) of the root element's start tag."""
+    pos = 0
+    while True:
+        pos = mm.find(b'<', pos)
+        if pos < 0:
+            raise ValueError("no root element found")
+        if mm[pos:pos + 4] == b'<!--':
+            pos = mm.find(b'-->', pos) + 3
+        elif mm[pos:pos + 2] in (b'<?', b'<!'):
+            pos = mm.find(b'>', pos) + 1
+        else:
+            break
+        if pos <= 2:
+            raise ValueError("unterminated markup before root element")
+    m = _TAG_NAME_RE.match(mm, pos)
+    end = mm.find(b'>', pos) + 1
+    if m is None or end <= 0:
+        raise ValueError("malformed root start tag")
+    return pos, end, m.group(1)
+
+
+def plan_shards(mm: mmap.mmap, jobs: int) -> Tuple[int, List[Tuple[int, int]], bytes, bytes]:
+    """Split the page region of ``mm`` into at most ``jobs`` byte ranges.
+
+    Returns (prolog_end, ranges, root_open, root_close). Ranges are empty if
+    the dump has no pages.
+    """
+    start, end, qname = root_start_tag(mm)
+    prefix = qname[:qname.index(b':') + 1] if b':' in qname else b''
+    close_page = b'</' + prefix + b'page>'
+    close_site = b'</' + prefix + b'siteinfo>'
+
+    prolog_end = end
+    site = mm.find(close_site, end)
+    if site >= 0:
+        prolog_end = site + len(close_site)
+    last = mm.rfind(close_page, prolog_end)
+    if last < 0:
+        return prolog_end, [], b'', b''
+    last_end = last + len(close_page)
+
+    ranges: List[Tuple[int, int]] = []
+    lo = prolog_end
+    step = (last_end - prolog_end) // jobs
+    for i in range(1, jobs):
+        hit = mm.find(close_page, max(lo, prolog_end + i * step), last_end)
+        if hit < 0:
+            break
+        hi = hit + len(close_page)
+        if hi >= last_end:
+            break
+        ranges.append((lo, hi))
+        lo = hi
+    ranges.append((lo, last_end))
+    return prolog_end, ranges, bytes(mm[start:end]), b'</' + qname + b'>'
+
+
+class ShardReader(io.RawIOBase):
+    """Raw reader over ``head`` + file bytes [start, stop) + ``tail``."""
+
+    def __init__(self, path: str, start: int, stop: int, head: bytes, tail: bytes) -> None:
+        super().__init__()
+        self._fd = os.open(path, os.O_RDONLY)
+        self._head = memoryview(head)
+        self._tail = memoryview(tail)
+        self._pos = start
+        self._stop = stop
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:  # type: ignore[no-untyped-def,override]
+        dst = memoryview(b).cast('B')
+        if self._head:
+            n = min(len(dst), len(self._head))
+            dst[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        if self._pos < self._stop:
+            n = os.preadv(self._fd, [dst[:self._stop - self._pos]], self._pos)
+            if n == 0:
+                raise EOFError("input file shrank while sharding")
+            self._pos += n
+            return n
+        n = min(len(dst), len(self._tail))
+        dst[:n] = self._tail[:n]
+        self._tail = self._tail[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            os.close(self._fd)
+        super().close()
+
+
+def _trim_shard(task: Tuple[str, int, int, bytes, bytes, str, int, Optional[str], bool]) -> int:
+    path, start, stop, head, tail, part, keep, sort_by, use_lxml = task
+    stream = trim.stream_trim_lxml if use_lxml else trim.stream_trim_stdlib
+    with io.BufferedReader(ShardReader(path, start, stop, head, tail), trim.GZIP_READ_BUFFER) as inp, \
+            open(part, 'wb', buffering=trim.OUTPUT_BUFFER) as out:
+        return stream(inp, out, keep, sort_by, False, fragment=True)  # type: ignore[arg-type]
+
+
+def sharded_trim(path: str, out: BinaryIO, part_dir: Optional[str], jobs: int, keep: int,
+                 sort_by: Optional[str], progress: bool, use_lxml: bool) -> int:
+    """Trim the plain dump file ``path`` into ``out`` using ``jobs`` processes."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        prolog_end, ranges, root_open, root_close = plan_shards(mm, jobs)
+        if not ranges:
+            out.write(mm[:])
+            return 0
+        out.write(mm[:prolog_end])
+        epilog = mm[ranges[-1][1]:]
+
+    parts: List[str] = []
+    try:
+        for _ in ranges:
+            fd, part = tempfile.mkstemp(prefix='mw_trim_', suffix='.part', dir=part_dir)
+            os.close(fd)
+            parts.append(part)
+        tasks = [(path, lo, hi, root_open, root_close, part, keep, sort_by, use_lxml)
+                 for (lo, hi), part in zip(ranges, parts)]
+        if progress:
+            trim.eprint(f"Sharding into {len(tasks)} range(s) across {jobs} process(es)")
+        total = 0
+        with multiprocessing.Pool(min(jobs, len(tasks))) as pool:
+            for n, (count, part) in enumerate(zip(pool.imap(_trim_shard, tasks), parts), 1):
+                with open(part, 'rb') as pf:
+                    shutil.copyfileobj(pf, out, trim.OUTPUT_BUFFER)
+                os.unlink(part)
+                total += count
+                if progress:
+                    trim.eprint(f"Shard {n}/{len(tasks)} done; pages so far: {total}")
+        out.write(epilog)
+    finally:
+        for part in parts:
+            try:
+                os.unlink(part)
+            except FileNotFoundError:
+                pass
+    if progress:
+        trim.eprint(f"Done. Total pages processed: {total}")
+    return total
@@ -12,12 +12,18 @@ latest revisions per <page> element.
 Features
 --------
 - Streaming mode powered by lxml (low memory; processes one <page> at a time)
-- Fallback full-tree mode using the Python standard library when lxml is absent
-  (higher memory; loads the entire XML tree)
+- Fallback streaming mode using the Python standard library when lxml is absent
+  (also one <page> at a time, but slower)
 - Keep the last N revisions (default 1)
 - Optional sorting by <timestamp> or revision <id> to select recency if the dump
-  ordering is not guaranteed
-- Supports gzipped input/output (.gz suffix auto-detected)
+  ordering is not guaranteed (compiled with Cython when _trim_fast.pyx has
+  been built via `cythonize -i _trim_fast.pyx`)
+- Supports gzipped input/output (.gz suffix auto-detected; uses rapidgzip or
+  isal when installed)
+- Optional --uring flag that overlaps disk reads with parsing via io_uring
+  on Linux (needs liburing; only pays off on input not in the page cache)
+- Optional --jobs N mode that trims </page>-aligned byte ranges of a plain
+  input file in N worker processes (see _shard.py)
 - Progress feedback (pages processed) to stderr
 
 Limitations / Notes
@@ -27,10 +33,10 @@ Limitations / Notes
 - Typical dumps list revisions chronologically (oldest -> newest); if that is
   true you can skip --sort-by for best performance.
 - Namespace handling is preserved in streaming mode via lxml. In stdlib mode,
-  original namespace declarations are preserved by re-serializing the modified
-  tree; ordering of namespace declarations may differ.
-- The full-tree fallback can consume large amounts of memory on big dumps; use
-  lxml for production-scale history dumps.
+  ElementTree chooses its own prefixes (e.g. ns0:) and each <page> carries
+  its own namespace declaration.
+- The stdlib fallback parses in Python-driven event loops; use lxml for
+  production-scale history dumps.
 
 Usage Examples
 --------------
@@ -43,7 +49,13 @@ Keep last 5 revisions per page, sorting defensively by timestamp, show progress:
 Read from stdin, write to stdout (use '-' for either path):
   zcat input.xml.gz | python mw_trim_revisions.py - --keep 1 > trimmed.xml
 
-Force stdlib (non-streaming) mode (for debugging, or if lxml streaming quirks):
+Read a cold, uncompressed dump through io_uring read-ahead (Linux, liburing):
+  python mw_trim_revisions.py input.xml --uring -o trimmed.xml
+
+Trim a large uncompressed dump on 8 cores:
+  python mw_trim_revisions.py input.xml --jobs 8 -o trimmed.xml
+
+Force stdlib mode (for debugging, or if lxml streaming quirks):
   python mw_trim_revisions.py input.xml -o trimmed.xml --force-stdlib
 
 Exit Codes
@@ -57,8 +69,11 @@ from __future__ import annotations
 import argparse
 import gzip
 import io
+import itertools
+import os
 import sys
-from typing import Any, BinaryIO, List, Optional, TextIO, Tuple, Union
+from operator import itemgetter
+from typing import Any, BinaryIO, List, Optional, TextIO, Tuple, Union, cast
 
 try:  # Optional dependency
     from lxml import etree as LET  # type: ignore
@@ -67,8 +82,41 @@ except Exception:  # pragma: no cover - environment dependent
     _HAVE_LXML = False
     LET = None  # type: ignore
 
+try:  # Optional dependency: parallel gzip decompression
+    import rapidgzip  # type: ignore
+    _HAVE_RAPIDGZIP = True
+except Exception:  # pragma: no cover - environment dependent
+    _HAVE_RAPIDGZIP = False
+    rapidgzip = None  # type: ignore
+
+try:  # Optional dependency: ISA-L accelerated gzip
+    from isal import igzip  # type: ignore
+    _HAVE_ISAL = True
+except Exception:  # pragma: no cover - environment dependent
+    _HAVE_ISAL = False
+    igzip = None  # type: ignore
+
+try:  # Optional dependency: io_uring read-ahead (Linux, needs liburing)
+    from _uring_reader import UringReader  # type: ignore
+    _HAVE_URING = sys.platform == 'linux'
+except Exception:  # pragma: no cover - environment dependent
+    _HAVE_URING = False
+
+try:  # Optional compiled helper (see _trim_fast.pyx)
+    from _trim_fast import SORT_ID, SORT_TIMESTAMP, trim_page_fast  # type: ignore
+    _HAVE_TRIM_FAST = True
+except Exception:  # pragma: no cover - built on demand
+    _HAVE_TRIM_FAST = False
+
 import xml.etree.ElementTree as ET  # stdlib fallback
 
+
+# Read-ahead size for compressed input; large enough to amortize per-call
+# decompressor overhead without holding much memory.
+GZIP_READ_BUFFER = 128 * 1024
+# Write buffer placed in front of the output stream by the streaming writers.
+OUTPUT_BUFFER = 1 << 20
+
 # ---------------------------------------------------------------------------
 # Utility helpers
 # ---------------------------------------------------------------------------
@@ -77,11 +125,16 @@ def eprint(*args: object, **kwargs) -> None:
     print(*args, file=sys.stderr, **kwargs)
 
 
-def smart_open(path: str, mode: str) -> Union[BinaryIO, TextIO]:
+def smart_open(path: str, mode: str, uring: bool = False) -> Union[BinaryIO, TextIO]:
     """Open a file path or '-' (stdin/stdout). Binary/text decided by caller.
 
     If the path ends with .gz, wrap with gzip. Caller supplies correct mode
-    ('rb', 'wb') etc.
+    ('rb', 'wb') etc. Binary gzip streams prefer rapidgzip (parallel
+    decompression) or isal (faster single-threaded codec) when installed,
+    since decompression otherwise bounds how fast the parser is fed.
+    With uring=True, uncompressed input files are read through io_uring on
+    Linux when the liburing package is available; plain open() is otherwise
+    used, and is faster for input already in the page cache.
     """
     if path == '-':
         if 'r' in mode:
@@ -89,138 +142,333 @@ def smart_open(path: str, mode: str) -> Union[BinaryIO, TextIO]:
         else:
             return sys.stdout.buffer if 'b' in mode else sys.stdout
     if path.endswith('.gz'):
+        if mode == 'rb':
+            if _HAVE_RAPIDGZIP:
+                return rapidgzip.open(path, parallelization=os.cpu_count() or 1)  # type: ignore[union-attr]
+            if _HAVE_ISAL:
+                return io.BufferedReader(igzip.IGzipFile(path, 'rb'), buffer_size=GZIP_READ_BUFFER)  # type: ignore[union-attr]
+            return io.BufferedReader(gzip.open(path, 'rb'), buffer_size=GZIP_READ_BUFFER)  # type: ignore[arg-type]
+        if mode == 'wb' and _HAVE_ISAL:
+            return igzip.open(path, 'wb')  # type: ignore[union-attr]
         return gzip.open(path, mode)  # type: ignore[arg-type]
+    if uring and mode == 'rb' and _HAVE_URING:
+        try:
+            return UringReader(path)  # type: ignore[return-value]
+        except OSError:
+            pass  # e.g. io_uring disabled by seccomp, or not a regular file
     return open(path, mode)  # type: ignore[arg-type]
 
 
-def localname(tag: str) -> str:
-    return tag.split('}')[-1]
+def open_output(path: str) -> BinaryIO:
+    """Open the binary output sink used by the streaming writers.
+
+    Every sink (plain file, stdout or gzip) sits behind a large
+    io.BufferedWriter, so the per-page writes reach the OS in big chunks.
+    """
+    if path != '-' and not path.endswith('.gz'):
+        return open(path, 'wb', buffering=OUTPUT_BUFFER)
+    return io.BufferedWriter(cast(BinaryIO, smart_open(path, 'wb')), buffer_size=OUTPUT_BUFFER)
+
+
+# Qualified tag names of the dump being processed. set_dump_namespace() fills
+# these in from the root element so hot loops can compare ``elem.tag``
+# directly instead of splitting off the namespace for every element.
+TAG_PAGE = 'page'
+TAG_REV = 'revision'
+TAG_ID = 'id'
+TAG_TS = 'timestamp'
+TAG_SITEINFO = 'siteinfo'
+
+
+def set_dump_namespace(root_tag: str) -> None:
+    global TAG_PAGE, TAG_REV, TAG_ID, TAG_TS, TAG_SITEINFO
+    ns = root_tag[:root_tag.index('}') + 1] if root_tag.startswith('{') else ''
+    TAG_PAGE = ns + 'page'
+    TAG_REV = ns + 'revision'
+    TAG_ID = ns + 'id'
+    TAG_TS = ns + 'timestamp'
+    TAG_SITEINFO = ns + 'siteinfo'
+
+
+def drop_earliest_revisions(page_elem, to_drop: int) -> None:  # type: ignore[no-untyped-def]
+    """Remove the first ``to_drop`` <revision> children, assuming the dump
+    lists them chronologically. No per-revision list is built.
+    """
+    # Revisions follow a handful of page metadata elements, so deleting by a
+    # fixed leading index avoids the linear search done by remove().
+    i = 0
+    while to_drop > 0:
+        if page_elem[i].tag == TAG_REV:
+            del page_elem[i]
+            to_drop -= 1
+        else:
+            i += 1
+
+
+def revision_key(rev) -> Tuple[str, int]:  # type: ignore[no-untyped-def]
+    """Return (timestamp, id) of one <revision> element.
+
+    Works for both lxml and stdlib elements. The children are walked once to
+    pick up <id> and <timestamp>; missing values become '' and -1
+    respectively. Leaf text is used as-is: dump leaves carry no padding, and
+    int() tolerates surrounding whitespace anyway. Requires
+    set_dump_namespace() to have been called.
+    """
+    ts = ''
+    rid = -1
+    for field in rev:
+        tag = field.tag
+        if tag == TAG_ID:
+            if field.text:
+                rid = int(field.text)
+        elif tag == TAG_TS:
+            if field.text:
+                ts = field.text
+    return ts, rid
+
+
+def revision_infos(revisions) -> List[Tuple[str, int, int, Any]]:  # type: ignore[no-untyped-def]
+    """Collect (timestamp, id, position, element) for each <revision> given.
+
+    Keys come from revision_key(). The position is unique, so the tuples sort
+    natively (and stably) without ever comparing the elements themselves.
+    """
+    infos: List[Tuple[str, int, int, Any]] = []
+    for child in revisions:
+        ts, rid = revision_key(child)
+        infos.append((ts, rid, len(infos), child))
+    return infos
+
+
+def newest_revision(revisions, sort_by: str):  # type: ignore[no-untyped-def]
+    """Return the revision that sorts last by ``sort_by`` ('timestamp' or 'id').
+
+    The --keep 1 counterpart of sorting revision_infos(): a single argmax
+    pass over the same revision_key() values, with the same tie-breaking
+    (timestamp, then id, then the later position wins), and no key tuples
+    kept.
+    """
+    by_ts = sort_by == 'timestamp'
+    best = None
+    best_ts = ''
+    best_rid = -1
+    for rev in revisions:
+        ts, rid = revision_key(rev)
+        if best is None:
+            pass
+        elif by_ts:
+            if ts < best_ts or (ts == best_ts and rid < best_rid):
+                continue
+        elif rid < best_rid:
+            continue
+        best, best_ts, best_rid = rev, ts, rid
+    return best
 
 # ---------------------------------------------------------------------------
 # Streaming implementation (lxml)
 # ---------------------------------------------------------------------------
 
-def stream_trim_lxml(inp: BinaryIO, out: BinaryIO, keep: int, sort_by: Optional[str], progress: bool) -> None:
+def inherited_ns_declaration(shell) -> bytes:  # type: ignore[no-untyped-def]
+    """Return the namespace declarations lxml puts on a serialized child of ``shell``.
+
+    A subtree serialized on its own redeclares every namespace in scope
+    (e.g. `` xmlns="..." xmlns:xsi="..."``), although in the output it sits
+    inside the root element that already declares them. ``shell`` is a bare
+    copy of that root; it is left unchanged.
+    """
+    probe = LET.SubElement(shell, TAG_PAGE)
+    try:
+        data = LET.tostring(probe, encoding='utf-8')
+    finally:
+        shell.remove(probe)
+    start = data.find(b' ')
+    return data[start:data.rindex(b'/>')] if start >= 0 else b''
+
+
+def write_child_lxml(out: BinaryIO, elem, ns_decl: bytes) -> None:  # type: ignore[no-untyped-def]
+    """Write ``elem`` and its tail without redeclaring the root's namespaces."""
+    data = LET.tostring(elem, encoding='utf-8', with_tail=True)
+    at = data.find(ns_decl, 0, data.index(b'>')) if ns_decl else -1
+    if at < 0:
+        out.write(data)
+        return
+    # Two slices of one buffer: no second copy of the page is made.
+    with memoryview(data) as mv:
+        out.write(mv[:at])
+        out.write(mv[at + len(ns_decl):])
+
+
+def stream_trim_lxml(inp: BinaryIO, out: BinaryIO, keep: int, sort_by: Optional[str], progress: bool,
+                     fragment: bool = False) -> int:
+    """Trim pages from ``inp`` into ``out``; returns the number of pages.
+
+    With ``fragment`` the XML declaration and root tags are not written, so
+    the output can be spliced into another document (see _shard).
+    """
     assert _HAVE_LXML and LET is not None
 
-    context = LET.iterparse(inp, events=('start', 'end'))
-    root = None
+    # Only <siteinfo> and <page> are acted upon; filtering by tag keeps lxml
+    # from dispatching an event for every nested element of every revision.
+    context = LET.iterparse(
+        inp,
+        events=('end',),
+        tag=('{*}page', '{*}siteinfo'),
+        huge_tree=True,
+        remove_blank_text=False,
+    )
     pages_processed = 0
 
-    with LET.xmlfile(out, encoding='utf-8') as xf:
-        for event, elem in context:
-            lname = localname(elem.tag)
-            if event == 'start' and root is None:
-                root = elem
-                with xf.element(root.tag, root.attrib, nsmap=root.nsmap):
-                    continue
-            if event != 'end':
-                continue
-            if lname == 'siteinfo':
-                xf.write(elem)
-                elem.clear()
-            elif lname == 'page':
-                trim_page_lxml(elem, keep=keep, sort_by=sort_by)
-                xf.write(elem)
-                pages_processed += 1
-                if progress and pages_processed % 1000 == 0:
-                    eprint(f"Processed {pages_processed} pages...")
-                elem.clear()
-                while elem.getprevious() is not None:
-                    del elem.getparent()[0]
+    try:
+        _, first = next(context)
+    except StopIteration:
+        return 0
+    root = first.getparent()
+    if root is None:
+        raise ValueError("expected <page>/<siteinfo> elements below a document root")
+    set_dump_namespace(root.tag)
+    shell = LET.Element(root.tag, root.attrib, nsmap=root.nsmap)
+    shell.text = ''  # forces an explicit end tag we can split off
+    shell_bytes = LET.tostring(shell, encoding='utf-8')
+    split_at = shell_bytes.rindex(b'</')
+    ns_decl = inherited_ns_declaration(shell)
+
+    if not fragment:
+        out.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+        out.write(shell_bytes[:split_at])
+    if root.text:
+        out.write(root.text.encode('utf-8'))
+    for elem in itertools.chain((first,), (e for _, e in context)):
+        if elem.tag == TAG_SITEINFO:
+            write_child_lxml(out, elem, ns_decl)
+            elem.clear()
+            continue
+        trim_page_lxml(elem, keep=keep, sort_by=sort_by)
+        write_child_lxml(out, elem, ns_decl)
+        pages_processed += 1
+        if progress and pages_processed % 1000 == 0:
+            eprint(f"Processed {pages_processed} pages...")
+        elem.clear()
+        # Every earlier sibling was dropped on the previous iteration, so at
+        # most one cleared element (the prior page or siteinfo) is left.
+        if elem.getprevious() is not None:
+            del root[0]
+    if not fragment:
+        out.write(shell_bytes[split_at:])
     if progress:
         eprint(f"Done. Total pages processed: {pages_processed}")
+    return pages_processed
 
 
 def trim_page_lxml(page_elem, keep: int, sort_by: Optional[str]):  # type: ignore[no-untyped-def]
-    revisions = [c for c in page_elem if localname(c.tag) == 'revision']
-    if len(revisions) <= keep:
+    # Count first: most pages need no trimming and then nothing is allocated.
+    n_rev = sum(1 for _ in page_elem.iterchildren(TAG_REV))
+    if n_rev <= keep:
         return
-    if sort_by == 'timestamp':
-        rev_infos: List[Tuple[Tuple[str, int], int, Any]] = []
-        for rev in revisions:
-            rid_elem = rev.find('./{*}id')
-            rid = int(rid_elem.text.strip()) if rid_elem is not None and rid_elem.text else -1
-            ts_elem = rev.find('./{*}timestamp')
-            ts = ts_elem.text.strip() if ts_elem is not None and ts_elem.text else ''
-            key = (ts, rid)
-            rev_infos.append((key, rid, rev))
-        rev_infos.sort(key=lambda x: x[0])
-        keep_set = {id_ for _, id_, _ in rev_infos[-keep:]}
-    elif sort_by == 'id':
-        rev_infos_id: List[Tuple[int, int, Any]] = []
+    if sort_by is None:
+        drop_earliest_revisions(page_elem, n_rev - keep)
+        return
+    if _HAVE_TRIM_FAST:
+        mode = SORT_TIMESTAMP if sort_by == 'timestamp' else SORT_ID
+        trim_page_fast(page_elem, keep, mode, TAG_REV, TAG_ID, TAG_TS)
+        return
+    revisions = list(page_elem.iterchildren(TAG_REV))
+    if keep == 1:
+        newest = newest_revision(revisions, sort_by)
         for rev in revisions:
-            rid_elem = rev.find('./{*}id')
-            rid = int(rid_elem.text.strip()) if rid_elem is not None and rid_elem.text else -1
-            rev_infos_id.append((rid, rid, rev))
-        rev_infos_id.sort(key=lambda x: x[0])
-        keep_set = {id_ for _, id_, _ in rev_infos_id[-keep:]}
-    else:
-        # Assume chronological ordering; drop earliest
-        for rev in revisions[:-keep]:
-            page_elem.remove(rev)
+            if rev is not newest:
+                page_elem.remove(rev)
         return
-    for rev in revisions:
-        rid_elem = rev.find('./{*}id')
-        rid = int(rid_elem.text.strip()) if rid_elem is not None and rid_elem.text else -1
-        if rid not in keep_set:
-            page_elem.remove(rev)
+    rev_infos: List[Tuple[str, int, int, Any]] = revision_infos(revisions)
+    if sort_by == 'timestamp':
+        rev_infos.sort()
+    else:
+        rev_infos.sort(key=itemgetter(1))
+    for _, _, _, rev in rev_infos[:-keep]:
+        page_elem.remove(rev)
 
 # ---------------------------------------------------------------------------
-# Full-tree (stdlib) implementation
+# Streaming implementation (stdlib)
 # ---------------------------------------------------------------------------
 
-def fulltree_trim_stdlib(inp: BinaryIO, out: BinaryIO, keep: int, sort_by: Optional[str], progress: bool) -> None:
-    tree = ET.parse(inp)
-    root = tree.getroot()
+def stream_trim_stdlib(inp: BinaryIO, out: BinaryIO, keep: int, sort_by: Optional[str], progress: bool,
+                       fragment: bool = False) -> int:
+    """Stdlib counterpart of stream_trim_lxml, with the same contract."""
+    context = ET.iterparse(inp, events=('start', 'end'))
+    root: Optional[ET.Element] = None
+    close_tag = b''
+    depth = 0
     pages_processed = 0
 
-    for page in list(root):
-        if localname(page.tag) != 'page':
+    if not fragment:
+        out.write(b"<?xml version='1.0' encoding='utf-8'?>\n")
+    for event, elem in context:
+        if event == 'start':
+            depth += 1
+            if root is None:
+                root = elem
+                set_dump_namespace(root.tag)
+                # Serialize an empty copy of the root so ElementTree picks the
+                # same namespace prefixes it will use for each page below.
+                shell = ET.tostring(ET.Element(root.tag, root.attrib), encoding='utf-8', short_empty_elements=False)
+                split_at = shell.rindex(b'</')
+                if not fragment:
+                    out.write(shell[:split_at])
+                    close_tag = shell[split_at:]
             continue
-        trim_page_stdlib(page, keep=keep, sort_by=sort_by)
-        pages_processed += 1
-        if progress and pages_processed % 1000 == 0:
-            eprint(f"Processed {pages_processed} pages...")
+        depth -= 1
+        if depth == 0:
+            out.write(close_tag)
+            break
+        if depth != 1:
+            continue
+        assert root is not None
+        if root.text:
+            # Whitespace between the root start tag and its first child is
+            # only known once that child has been parsed.
+            out.write(root.text.encode('utf-8'))
+            root.text = None
+        if elem.tag == TAG_PAGE:
+            trim_page_stdlib(elem, keep=keep, sort_by=sort_by)
+            pages_processed += 1
+            if progress and pages_processed % 1000 == 0:
+                eprint(f"Processed {pages_processed} pages...")
+        ET.ElementTree(elem).write(out, encoding='utf-8')
+        # iterparse keeps finished elements attached to the root; detach them
+        # so memory stays bounded by a single page.
+        elem.clear()
+        root.remove(elem)
 
     if progress:
-        eprint(f"Serialization starting. Pages processed: {pages_processed}")
-    tree.write(out, encoding='utf-8', xml_declaration=True)
-    if progress:
-        eprint("Done.")
+        eprint(f"Done. Total pages processed: {pages_processed}")
+    return pages_processed
 
 
 def trim_page_stdlib(page_elem: ET.Element, keep: int, sort_by: Optional[str]):
-    revisions = [c for c in page_elem if localname(c.tag) == 'revision']
-    if len(revisions) <= keep:
+    # Count first: most pages need no trimming and then nothing is allocated.
+    n_rev = sum(1 for _ in page_elem.iterfind(TAG_REV))
+    if n_rev <= keep:
         return
-    if sort_by == 'timestamp':
-        rev_infos: List[Tuple[Tuple[str, int], int, ET.Element]] = []
-        for rev in revisions:
-            rid_elem = rev.find('id') or next((child for child in rev if localname(child.tag) == 'id'), None)
-            rid = int(rid_elem.text.strip()) if (rid_elem is not None and rid_elem.text) else -1
-            ts_elem = rev.find('timestamp') or next((child for child in rev if localname(child.tag) == 'timestamp'), None)
-            ts = ts_elem.text.strip() if (ts_elem is not None and ts_elem.text) else ''
-            rev_infos.append(((ts, rid), rid, rev))
-        rev_infos.sort(key=lambda x: x[0])
-        keep_set = {id_ for _, id_, _ in rev_infos[-keep:]}
-    elif sort_by == 'id':
-        rev_infos_id: List[Tuple[int, int, ET.Element]] = []
+    if sort_by is None:
+        drop_earliest_revisions(page_elem, n_rev - keep)
+        return
+    if _HAVE_TRIM_FAST:
+        mode = SORT_TIMESTAMP if sort_by == 'timestamp' else SORT_ID
+        trim_page_fast(page_elem, keep, mode, TAG_REV, TAG_ID, TAG_TS)
+        return
+    revisions = list(page_elem.iterfind(TAG_REV))
+    if keep == 1:
+        newest = newest_revision(revisions, sort_by)
         for rev in revisions:
-            rid_elem = rev.find('id') or next((child for child in rev if localname(child.tag) == 'id'), None)
-            rid = int(rid_elem.text.strip()) if (rid_elem is not None and rid_elem.text) else -1
-            rev_infos_id.append((rid, rid, rev))
-        rev_infos_id.sort(key=lambda x: x[0])
-        keep_set = {id_ for _, id_, _ in rev_infos_id[-keep:]}
-    else:
-        for rev in revisions[:-keep]:
-            page_elem.remove(rev)
+            if rev is not newest:
+                page_elem.remove(rev)
         return
-    for rev in revisions:
-        rid_elem = rev.find('id') or next((child for child in rev if localname(child.tag) == 'id'), None)
-        rid = int(rid_elem.text.strip()) if (rid_elem is not None and rid_elem.text) else -1
-        if rid not in keep_set:
-            page_elem.remove(rev)
+    rev_infos: List[Tuple[str, int, int, ET.Element]] = revision_infos(revisions)
+    if sort_by == 'timestamp':
+        rev_infos.sort()
+    else:
+        rev_infos.sort(key=itemgetter(1))
+    for _, _, _, rev in rev_infos[:-keep]:
+        page_elem.remove(rev)
 
 # ---------------------------------------------------------------------------
 # Argument parsing & main
@@ -236,12 +484,16 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     p.add_argument('-k', '--keep', type=int, default=1, help="Number of most recent revisions to keep per page.")
     p.add_argument('--sort-by', choices=['timestamp', 'id'], help="Select most recent revisions by key instead of assuming chronological order in dump.")
     p.add_argument('--progress', action='store_true', help="Print progress (every 1000 pages) to stderr.")
-    p.add_argument('--force-stdlib', action='store_true', help="Force full-tree stdlib mode even if lxml is available.")
+    p.add_argument('--force-stdlib', action='store_true', help="Force stdlib streaming mode even if lxml is available.")
+    p.add_argument('--uring', action='store_true', help="Read plain input files through io_uring read-ahead (Linux, needs liburing).")
+    p.add_argument('-j', '--jobs', type=int, default=1, help="Trim pages in N worker processes (plain input files only).")
     p.add_argument('--version', action='version', version='mw_trim_revisions 0.1.0')
     args = p.parse_args(argv)
 
     if args.keep < 1:
         p.error('--keep must be >= 1')
+    if args.jobs < 1:
+        p.error('--jobs must be >= 1')
     return args
 
 
@@ -250,19 +502,36 @@ def main(argv: Optional[List[str]] = None) -> int:
 
     use_streaming = _HAVE_LXML and not args.force_stdlib
     if args.progress:
-        mode = 'streaming (lxml)' if use_streaming else 'full-tree (stdlib)'
+        mode = 'streaming (lxml)' if use_streaming else 'streaming (stdlib)'
         eprint(f"Mode: {mode}; keeping last {args.keep} revision(s)")
         if args.sort_by:
             eprint(f"Selecting revisions by: {args.sort_by}")
         if not _HAVE_LXML and not args.force_stdlib:
-            eprint("lxml not available; falling back to full-tree mode.")
+            eprint("lxml not available; falling back to stdlib mode.")
+
+    jobs = args.jobs
+    if jobs > 1 and (args.input == '-' or args.input.endswith('.gz')):
+        eprint("--jobs needs a plain input file; running serially.")
+        jobs = 1
+
+    uring = args.uring
+    if uring and not _HAVE_URING:
+        eprint("--uring needs Linux and the liburing package; using plain reads.")
+        uring = False
 
     try:
-        with smart_open(args.input, 'rb') as inf, smart_open(args.output, 'wb') as outf:  # type: ignore[assignment]
+        if jobs > 1:
+            import _shard
+            part_dir = None if args.output == '-' else os.path.dirname(os.path.abspath(args.output))
+            with open_output(args.output) as outf:
+                _shard.sharded_trim(args.input, outf, part_dir, jobs, keep=args.keep, sort_by=args.sort_by,
+                                    progress=args.progress, use_lxml=use_streaming)
+            return 0
+        with smart_open(args.input, 'rb', uring=uring) as inf, open_output(args.output) as outf:  # type: ignore[assignment]
             if use_streaming:
                 stream_trim_lxml(inf, outf, keep=args.keep, sort_by=args.sort_by, progress=args.progress)  # type: ignore[arg-type]
             else:
-                fulltree_trim_stdlib(inf, outf, keep=args.keep, sort_by=args.sort_by, progress=args.progress)  # type: ignore[arg-type]
+                stream_trim_stdlib(inf, outf, keep=args.keep, sort_by=args.sort_by, progress=args.progress)  # type: ignore[arg-type]
     except KeyboardInterrupt:  # pragma: no cover
         eprint("Interrupted.")
         return 1
@@ -0,0 +1,88 @@
+import io
+
+import pytest
+
+import mw_trim_revisions as trim
+
+pytest.importorskip("lxml")
+
+NS = "http://www.mediawiki.org/xml/export-0.10/"
+
+
+def make_dump(pages: int = 12, revisions: int = 3) -> bytes:
+    out = [
+        f'<mediawiki xmlns="{NS}" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"'
+        ' version="0.10" xml:lang="en">\n'
+        "  <siteinfo>\n    <sitename>Test</sitename>\n  </siteinfo>\n"
+    ]
+    for p in range(pages):
+        out.append(f"  <page>\n    <title>Page {p}</title>\n    <ns>0</ns>\n    <id>{p + 1}</id>\n")
+        for r in range(revisions):
+            rid = p * 100 + r
+            out.append(
+                f"    <revision>\n      <id>{rid}</id>\n"
+                f"      <timestamp>2020-01-{r + 1:02d}T00:00:00Z</timestamp>\n"
+                f"      <text>rev {rid}</text>\n    </revision>\n"
+            )
+        out.append("  </page>\n")
+    out.append("</mediawiki>\n")
+    return "".join(out).encode("utf-8")
+
+
+def trim_serial(dump: bytes, keep: int = 1) -> bytes:
+    out = io.BytesIO()
+    trim.stream_trim_lxml(io.BytesIO(dump), out, keep=keep, sort_by=None, progress=False)
+    return out.getvalue()
+
+
+def page_region(data: bytes) -> bytes:
+    start = data.index(b"</siteinfo>") + len(b"</siteinfo>")
+    return data[start:data.rindex(b"</page>") + len(b"</page>")]
+
+
+def test_trimmed_pages_inherit_root_namespaces():
+    data = trim_serial(make_dump())
+    assert data.count(b"xmlns=") == 1
+    assert b"<page>" in data
+    assert b"<siteinfo>" in data
+    assert data.count(b"<revision>") == 12
+
+
+def test_sharded_pages_match_serial_bytes(tmp_path):
+    import _shard
+
+    dump = tmp_path / "dump.xml"
+    dump.write_bytes(make_dump(pages=40))
+    serial = trim_serial(dump.read_bytes())
+    out = io.BytesIO()
+    total = _shard.sharded_trim(
+        str(dump), out, str(tmp_path), 3, keep=1, sort_by=None, progress=False, use_lxml=True
+    )
+    assert total == 40
+    pages = page_region(out.getvalue())
+    assert b"xmlns" not in pages
+    assert pages == page_region(serial)
+
+
+@pytest.mark.parametrize("sort_by", ["timestamp", "id"])
+def test_newest_revision_matches_sorted_revision_infos(sort_by):
+    import random
+    import xml.etree.ElementTree as ET
+
+    trim.set_dump_namespace("mediawiki")
+    rng = random.Random(0)
+    for _ in range(200):
+        revisions = []
+        for _ in range(rng.randint(1, 6)):
+            rev = ET.Element("revision")
+            if rng.random() < 0.9:
+                ET.SubElement(rev, "id").text = str(rng.randint(1, 4))
+            if rng.random() < 0.9:
+                ET.SubElement(rev, "timestamp").text = f"2020-01-0{rng.randint(1, 3)}T00:00:00Z"
+            revisions.append(rev)
+        infos = trim.revision_infos(revisions)
+        if sort_by == "timestamp":
+            infos.sort()
+        else:
+            infos.sort(key=lambda info: info[1])
+        assert trim.newest_revision(revisions, sort_by) is infos[-1][3]
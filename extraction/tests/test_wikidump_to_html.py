@@ -0,0 +1,87 @@
+import random
+from pathlib import Path
+
+import pytest
+
+import wikidump_to_html as w
+
+WIKI_FRAGMENTS = [
+    "Max", "Headroom", " ", "\n", "\n\n", "''", "'''", "'''''",
+    "[[Foo]]", "[[Foo|the foo]]", "[[Missing page]]", "[[", "]]", "|",
+    "[http://example.com Example]", "[https://youtu.be/x]", "[[Category:Cast]]",
+    "[[File:Bar.jpg|thumb|Caption]]", "[[File:Youtube.png|20px|link=https://youtube.com/x]]",
+    "== Heading ==", "\n=== Sub ===\n", "\n* item", "\n# step", "\n** nested",
+    "<h2", "<h3 class='x'>", "</h3>", "<a href='x.html'", "<a href=\"y.html\">",
+    "</a>", "<p>", "</p>", "<strong>", "</em>", "<ul>", "<b>", "<", ">",
+    "&amp;", "&nbsp;", "{{tmpl}}", "60px|link=https://youtube.com/v]]",
+]
+HTML_FRAGMENTS = [
+    "text", " ", "\n", "<h1>", "</h1>", "<h2 id='a'>", "</h2>", "<h6>", "</h6>",
+    "<p>", "</p>", "<li>", "</li>", "<ul>", "</ul>", "<ol>", "</ol>",
+    "<strong>", "</strong>", "<em>", "</em>", "<a href='p.html'>",
+    "<A HREF=\"https://x.org\">", "<a class='missing' href='q.html'>", "</a>",
+    "</A>", "<a href='x.html'", "<h3", "<figure>", "</figure>", "<", ">",
+    "&lt;", "&amp;", " ", "60px|link=https://youtu.be/z]]",
+]
+
+
+@pytest.fixture
+def converter():
+    c = w.WikiConverter(mode="markdown")
+    c.page_slugs.update({"Foo": "foo", "Max Headroom": "max-headroom"})
+    return c
+
+
+def chain_html_to_md(monkeypatch, body):
+    # _html_to_md with every body sent through the regex-chain fallback.
+    with monkeypatch.context() as m:
+        m.setattr(w, "_md_rewrite_tags", lambda body, tokens: w._md_rewrite_tags_chain(body))
+        return w._html_to_md(body)
+
+
+def random_text(rng, fragments, max_len=30):
+    return "".join(rng.choice(fragments) for _ in range(rng.randint(1, max_len)))
+
+
+@pytest.mark.parametrize(
+    "wikitext, expected",
+    [
+        ("Use <h2 for headings and '''bold''' text", "Use <h2 for headings and **bold** text"),
+        ("Tag <a href='x.html' here\n[[Foo]]", "Tag [Foo](foo.md)"),
+    ],
+)
+def test_html_to_md_overlapping_tags(converter, wikitext, expected):
+    assert w._html_to_md(converter.convert("Page", wikitext)[0]) == expected
+
+
+def test_html_to_md_single_scan_matches_chain(converter, monkeypatch):
+    rng = random.Random(0)
+    bodies = [converter.convert("Page", random_text(rng, WIKI_FRAGMENTS))[0] for _ in range(3000)]
+    bodies += [random_text(rng, HTML_FRAGMENTS) for _ in range(3000)]
+    for body in bodies:
+        assert w._html_to_md(body) == chain_html_to_md(monkeypatch, body), body
+
+
+DUMP = Path(__file__).resolve().parent.parent / "trimmed.xml"
+EDGE_DUMP = f"""<mediawiki xmlns="{w.NS[1:-1]}">
+  <page><title>Kept</title><revision><id>1</id><text>a</text></revision></page>
+  <page><title>No revisions</title></page>
+  <page><title></title><revision><id>2</id><text>b</text></revision></page>
+  <page><title>Two</title><revision><id>3</id></revision><revision><id>4</id></revision></page>
+</mediawiki>
+"""
+
+
+@pytest.mark.parametrize("use_lxml", [False, True])
+@pytest.mark.parametrize("edge", [False, True])
+def test_iter_titles_matches_iter_pages(tmp_path, monkeypatch, use_lxml, edge):
+    if use_lxml and not w._HAVE_LXML:
+        pytest.skip("lxml not installed")
+    monkeypatch.setattr(w, "_HAVE_LXML", use_lxml)
+    dump = DUMP
+    if edge:
+        dump = tmp_path / "edge.xml"
+        dump.write_text(EDGE_DUMP, encoding="utf-8")
+    expected = [p.title for p in w.iter_pages(dump)]
+    assert expected
+    assert list(w.iter_titles(dump)) == expected
@@ -10,63 +10,155 @@ Enhancements in this version:
 - Enhanced File: option parsing (alt=, link=, upright scaling, alignment classes)
 - Optional --dump-old-revisions flag: writes older revisions to per-page subdir slug/<rev-id>.html
 - Adds optional --media-dir CLI flag (reserved for future media copying)
+- Parses the dump with lxml when it is installed (stdlib ElementTree otherwise)
+- Optional --jobs N flag: converts and writes pages in N worker processes
 
 Still intentionally minimal / not a full wikitext engine.
 
 Usage:
-  python wikidump_to_html.py --dump path/to/dump.xml --out outdir [--limit 100] [--dump-old-revisions] [--media-dir media]
+  python wikidump_to_html.py --dump path/to/dump.xml --out outdir [--limit 100] [--dump-old-revisions] [--media-dir media] [--jobs 4]
 """
 from __future__ import annotations
 import argparse
+import functools
+import io
+import itertools
 import os
 import re
 import sys
 import unicodedata
 import urllib.parse
 import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from html import escape, unescape
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple, Set, Union
 from dataclasses import dataclass, field
 
+try:  # optional faster XML parser
+    from lxml import etree as LET  # type: ignore
+
+    _HAVE_LXML = True
+except Exception:  # pragma: no cover
+    LET = None  # type: ignore
+    _HAVE_LXML = False
+
 NS = "{http://www.mediawiki.org/xml/export-0.10/}"
 
-HEADING_RE = re.compile(r"^(=+)([^=].*?)(=+)\s*$")
+# Block-level line kinds, probed with a single match per line.
+LINE_KIND_RE = re.compile(
+    r"(?P<heading>=+)(?P<heading_text>[^=].*?)=+\s*$"
+    r"|(?P<list>[*#]+)\s*(?P<list_body>.*)"
+)
 BOLD_ITALIC_RE = re.compile(r"'''''(.*?)'''''")
 BOLD_RE = re.compile(r"'''(.*?)'''")
 ITALIC_RE = re.compile(r"''(.*?)''")
-LINK_RE = re.compile(r"\[\[([^\]|]+?)(?:\|([^\]]+))?]]")
-LIST_ITEM_RE = re.compile(r"^([*#]+)\s*(.*)")
-FILE_LINK_ANY_RE = re.compile(r"\[\[(File:[^\]]+)]]", re.IGNORECASE)
-CATEGORY_LINK_RE = re.compile(r"\[\[Category:([^|\]]+)(?:\|[^\]]*)?]]", re.IGNORECASE)
-EXTERNAL_LINK_RE = re.compile(r"\[(https?://[^\s\]]+)(?:\s+([^\]]+))?]")
-TEMPLATE_RE = re.compile(r"{{[^{}]*}}")
+# Runs of negated classes below are possessive (Python 3.11+): each is always
+# followed by a character it excludes, so giving text back never helps and
+# malformed markup fails fast instead of backtracking.
+CATEGORY_LINK_RE = re.compile(
+    r"\[\[Category:([^|\]]++)(?:\|[^\]]*+)?]]", re.IGNORECASE
+)
+TEMPLATE_RE = re.compile(r"{{[^{}]*+}}")
 COLLAPSIBLE_OPEN_RE = re.compile(
     r'<div[^>]*class=["\'][^"\']*collapsible[^"\']*["\'][^>]*>', re.IGNORECASE
 )
+REDIRECT_RE = re.compile(r"^\s*#redirect\s*:?\[\[([^\]]+)]]", re.IGNORECASE)
+DIV_OPEN_RE = re.compile(r"^<div[^>]*>", re.IGNORECASE)
+DIV_CLOSE_RE = re.compile(r"</div>\s*$", re.IGNORECASE)
+COLLAPSE_HEADER_RE = re.compile(r"<(strong|b|h[1-6])[^>]*>(.*?)</\1>", re.IGNORECASE)
+HREF_RE = re.compile(r"href='([^']+)'")
+FILE_SIZE_RE = re.compile(r"^(\d+)(?:x(\d+))?px$", re.IGNORECASE)
+FILE_UPRIGHT_RE = re.compile(r"^upright(?::?=([0-9]*\.?[0-9]+))?$", re.IGNORECASE)
+FILE_ALIGN_TOKENS = frozenset({"left", "right", "center", "none"})
+FILE_FRAME_TOKENS = frozenset({"thumb", "thumbnail", "frame", "frameless"})
+FILE_KNOWN_FLAGS = FILE_ALIGN_TOKENS | FILE_FRAME_TOKENS | {"upright"}
+# File links, wikilinks and external links are substituted in separate,
+# ordered passes: their matches can overlap (an unclosed "[[" before a File:
+# link, a wikilink inside an external link's label), and each pass taking its
+# own leftmost match is what decides which one wins.
+FILE_LINK_RE = re.compile(r"\[\[((?i:File:)[^\]]++)]]")
+LINK_RE = re.compile(r"\[\[([^\]|]++)(?:\|([^\]]++))?]]")
+EXTERNAL_LINK_RE = re.compile(r"\[(https?://[^\s\]]++)(?:\s+([^\]]++))?]")
+
+# HTML -> Markdown rewriting of converted bodies (see _html_to_md). One scan
+# finds every tag the rewrite understands and each alternative names its kind;
+# the shared "<" is factored out so the scan can jump from one "<" to the next.
+MD_TOKEN_RE = re.compile(
+    r"<(?:h(?P<h_open>[1-6])[^>]*>"
+    r"|/h(?P<h_close>[1-6])>"
+    r"|(?P<open>p|li|strong|em)>"
+    r"|/(?P<close>p|li|strong|em)>"
+    r"|(?P<list_tag>/?(?:ul|ol)>)"
+    r"|(?P<a_open>(?i:a\s+[^>]*href=['\"](?P<href>[^'\"]+)['\"][^>]*>))"
+    r"|(?P<a_close>(?i:/a>)))"
+)
+# Pairing order and the (open, close) Markdown each matched pair becomes.
+# Only <p> and <a> pairs may span lines.
+MD_PAIR_ORDER = [f"h{n}" for n in range(6, 0, -1)] + ["p", "li", "strong", "em", "a"]
+MD_PAIR_MULTILINE = frozenset(("p", "a"))
+MD_PAIR_MARKUP = {
+    **{f"h{n}": ("\n" + "#" * n + " ", "\n") for n in range(1, 7)},
+    "p": ("", "\n"),
+    "li": ("- ", "\n"),
+    "strong": ("**", "**"),
+    "em": ("*", "*"),
+}
+# The per-kind substitution chain the single scan stands in for. It is still
+# used for bodies where a matched tag's span contains another "<" (prose such
+# as "Use <h2 for headings" left unescaped by convert()): the scan's tokens
+# cannot overlap, so there it would pair different tags than the chain does.
+MD_HEADING_RES = [
+    ("\n" + "#" * n + " ", re.compile(rf"<h{n}[^>]*>(.*?)</h{n}>"))
+    for n in range(6, 0, -1)
+]
+MD_PARAGRAPH_RE = re.compile(r"<p>(.*?)</p>", re.DOTALL)
+MD_LIST_ITEM_RE = re.compile(r"<li>(.*?)</li>")
+MD_LIST_TAG_RE = re.compile(r"</?(ul|ol)>")
+MD_STRONG_RE = re.compile(r"<strong>(.*?)</strong>")
+MD_EM_RE = re.compile(r"<em>(.*?)</em>")
+MD_ANCHOR_RE = re.compile(
+    r"<a\s+[^>]*href=['\"]([^'\"]+)['\"][^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL
+)
+MD_ORPHAN_FILE_RE = re.compile(r"\b\d+px\|link=(https?://[^\]]+)]\]")
+MD_TAG_RE = re.compile(r"<[^>]+>")
 
 _slug_strip_re = re.compile(r"[^a-z0-9]+")
 
 
-def slugify(title: str, used: set[str]) -> str:
-    title_norm = (
-        unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode("ascii")
-    )
+@functools.lru_cache(maxsize=100_000)
+def _fold_ascii(s: str) -> str:
+    return unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+
+
+def slugify(
+    title: str, used: set[str], counters: Optional[Dict[str, int]] = None
+) -> str:
+    """Return a slug for title that is not yet in used, and add it there.
+
+    Collisions get the first free -2, -3, ... suffix. counters, if given,
+    remembers the next suffix to try per base so repeated collisions do not
+    rescan the suffixes already taken.
+    """
+    title_norm = _fold_ascii(title)
     lowered = title_norm.lower()
     slug = _slug_strip_re.sub("-", lowered).strip("-") or "page"
-    base = slug
-    i = 2
-    while slug in used:
+    if slug in used:
+        base = slug
+        i = counters.get(base, 2) if counters is not None else 2
         slug = f"{base}-{i}"
-        i += 1
+        while slug in used:
+            i += 1
+            slug = f"{base}-{i}"
+        if counters is not None:
+            counters[base] = i + 1
     used.add(slug)
     return slug
 
 
 def category_slug(name: str) -> str:
-    name_norm = (
-        unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
-    )
+    name_norm = _fold_ascii(name)
     core = _slug_strip_re.sub("-", name_norm.lower()).strip("-") or "category"
     return f"category-{core}"
 
@@ -83,11 +175,18 @@ def normalize_title(title: str) -> str:
 
 
 def heading_id(text: str) -> str:
-    base = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    base = _fold_ascii(text)
     base = _slug_strip_re.sub("-", base.lower()).strip("-")
     return base or "section"
 
 
+def _skip_ws(text: str, pos: int, end: int) -> int:
+    # Offset of the first non-whitespace character in text[pos:end], or end.
+    while pos < end and text[pos].isspace():
+        pos += 1
+    return pos
+
+
 def yaml_quote(s: str) -> str:
     # Simple YAML-safe double-quoted scalar
     return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
@@ -124,44 +223,33 @@ class WikiConverter:
     def __init__(self, mode: str = "html"):
         self.page_slugs: Dict[str, str] = {}
         self.mode = mode  # 'html' or 'markdown'
+        # Links are resolved against page_slugs, which build_pages fills in
+        # completely before the first convert() call.
+        self._link_for_target = functools.lru_cache(maxsize=100_000)(
+            self._resolve_link
+        )
 
-    def _link_for_target(self, target: str, label: Optional[str] = None) -> str:
+    def _resolve_link(self, target: str, label: Optional[str] = None) -> str:
         label = label if label is not None else target
         if "#" in target:
             base, frag = target.split("#", 1)
         else:
             base, frag = target, None
         norm_base = normalize_title(base)
-        slug = None
-        candidates = [
-            base,
-            norm_base,
-            base.replace("_", " "),
-            norm_base.replace(" ", "_"),
-        ]
-        seen = set()
-        ordered: List[str] = []
-        for c in candidates:
-            if c not in seen:
-                ordered.append(c)
-                seen.add(c)
-        for key in ordered:
-            if key in self.page_slugs:
-                slug = self.page_slugs[key]
-                break
+        slugs = self.page_slugs
+        slug = (
+            slugs.get(base)
+            or slugs.get(norm_base)
+            or slugs.get(base.replace("_", " "))
+            or slugs.get(norm_base.replace(" ", "_"))
+        )
         if slug:
             href = f"{slug}.html"
             if frag:
                 href += f"#{heading_id(frag)}"
             return f"<a href='{escape(href)}'>{escape(label)}</a>"
         pred = (
-            _slug_strip_re.sub(
-                "-",
-                unicodedata.normalize("NFKD", norm_base)
-                .encode("ascii", "ignore")
-                .decode("ascii")
-                .lower(),
-            ).strip("-")
+            _slug_strip_re.sub("-", _fold_ascii(norm_base).lower()).strip("-")
             or "page"
         )
         href = f"{pred}.html"
@@ -171,21 +259,28 @@ class WikiConverter:
 
     def convert(self, title: str, text: str) -> Tuple[str, List[str]]:
         text = text.replace("\r", "")
-        redirect_match = re.match(
-            r"^\s*#redirect\s*:?\[\[([^\]]+)]]", text, re.IGNORECASE
+        # The case-insensitive patterns below only run once a literal
+        # character they require is present.
+        first = _skip_ws(text, 0, len(text))
+        redirect_match = (
+            REDIRECT_RE.match(text) if text[first : first + 1] == "#" else None
         )
         if redirect_match:
             target_raw = redirect_match.group(1).strip()
             target_html = self._link_for_target(target_raw)
             html = f"<div class='redirectbox'>Redirect to {target_html}</div>"
             return html, []
-        for _ in range(10):
-            new_text = TEMPLATE_RE.sub("", text)
-            if new_text == text:
-                break
-            text = new_text
-        lines = text.split("\n")
-        html_lines: List[str] = []
+        # Innermost templates first, so nested ones unwrap one level per pass.
+        if "{{" in text:
+            for _ in range(10):
+                text, n = TEMPLATE_RE.subn("", text)
+                if not n:
+                    break
+        # Each emitted line is written with its trailing newline; the last
+        # one is dropped on return.
+        out = io.StringIO()
+        write = out.write
+        inline = self.inline
         list_stack: List[str] = []
         categories: List[str] = []
         cat_set: Set[str] = set()
@@ -193,7 +288,7 @@ class WikiConverter:
         def close_lists(to_level: int = 0):
             while len(list_stack) > to_level:
                 t = list_stack.pop()
-                html_lines.append(f"</{'ul' if t == '*' else 'ol'}>")
+                write(f"</{'ul' if t == '*' else 'ol'}>\n")
 
         def strip_categories(line: str) -> str:
             def repl(match):
@@ -203,14 +298,15 @@ class WikiConverter:
                     categories.append(cat)
                 return ""
 
+            if "[[" not in line:
+                return line
             return CATEGORY_LINK_RE.sub(repl, line)
 
         in_collapse = False
         collapse_lines: List[str] = []
         in_table = False
         table_lines: List[str] = []
-        for raw in lines:
-            line = raw.rstrip("\n")
+        for line in text.split("\n"):
             if not in_collapse and not in_table and line.lstrip().startswith("{|"):
                 in_table = True
                 table_lines = [line]
@@ -262,9 +358,10 @@ class WikiConverter:
                             )
                             for part in parts:
                                 part = part.strip()
-                                if "|" in part and re.match(r"^[^|]+\|", part):
-                                    attr_split = part.split("|", 1)
-                                    part = attr_split[1].strip()
+                                # "attrs | content": drop the attribute prefix
+                                attrs, sep, content = part.partition("|")
+                                if sep and attrs:
+                                    part = content.strip()
                                 part = strip_categories(part)
                                 current_row.append((part, is_header))
                             continue
@@ -281,7 +378,7 @@ class WikiConverter:
                     ) >= max(1, int(0.6 * len(rows)))
                     header_html = ""
                     if header_text:
-                        header_html = f"<header>{self.inline(header_text)}</header>"
+                        header_html = f"<header>{inline(header_text)}</header>"
                     if self.mode == "markdown":
                         # Produce Markdown representation of table/infobox
                         def _sanitize_md(cell: str) -> str:
@@ -289,22 +386,22 @@ class WikiConverter:
 
                         if key_value_style:
                             if header_text:
-                                html_lines.append(
-                                    f"**{_sanitize_md(self.inline(header_text))}**"
+                                write(
+                                    f"**{_sanitize_md(inline(header_text))}**\n"
                                 )
-                            html_lines.append("| Key | Value |")
-                            html_lines.append("| --- | ----- |")
+                            write("| Key | Value |\n")
+                            write("| --- | ----- |\n")
                             for r in rows:
                                 if len(r) == 2:
                                     k, v = r
-                                    k_txt = _sanitize_md(self.inline(k[0]))
-                                    v_txt = _sanitize_md(self.inline(v[0]))
-                                    html_lines.append(f"| {k_txt} | {v_txt} |")
+                                    k_txt = _sanitize_md(inline(k[0]))
+                                    v_txt = _sanitize_md(inline(v[0]))
+                                    write(f"| {k_txt} | {v_txt} |\n")
                                 else:
                                     joined = _sanitize_md(
-                                        " — ".join(self.inline(c[0]) for c in r)
+                                        " — ".join(inline(c[0]) for c in r)
                                     )
-                                    html_lines.append(f"|  | {joined} |")
+                                    write(f"|  | {joined} |\n")
                         else:
                             if rows:
                                 header_row = rows[0]
@@ -313,12 +410,12 @@ class WikiConverter:
                                 for idx in range(max_cols):
                                     if idx < len(header_row):
                                         txt, is_header = header_row[idx]
-                                        headers.append(_sanitize_md(self.inline(txt)))
+                                        headers.append(_sanitize_md(inline(txt)))
                                     else:
                                         headers.append("")
-                                html_lines.append("| " + " | ".join(headers) + " |")
-                                html_lines.append(
-                                    "| " + " | ".join(["---"] * max_cols) + " |"
+                                write("| " + " | ".join(headers) + " |\n")
+                                write(
+                                    "| " + " | ".join(["---"] * max_cols) + " |\n"
                                 )
                                 start_idx = 1
                                 for r in rows[start_idx:]:
@@ -326,45 +423,39 @@ class WikiConverter:
                                     for idx in range(max_cols):
                                         if idx < len(r):
                                             cells.append(
-                                                _sanitize_md(self.inline(r[idx][0]))
+                                                _sanitize_md(inline(r[idx][0]))
                                             )
                                         else:
                                             cells.append("")
-                                    html_lines.append("| " + " | ".join(cells) + " |")
+                                    write("| " + " | ".join(cells) + " |\n")
                         in_table = False
                         continue
                     if key_value_style:
-                        body_parts = [
-                            f"<aside class='collapsible infobox'>{header_html}<dl>"
-                        ]
+                        write(f"<aside class='collapsible infobox'>{header_html}<dl>")
                         for r in rows:
                             if len(r) == 2:
                                 k, v = r
-                                body_parts.append(
-                                    f"<dt>{self.inline(k[0])}</dt><dd>{self.inline(v[0])}</dd>"
+                                write(
+                                    f"<dt>{inline(k[0])}</dt><dd>{inline(v[0])}</dd>"
                                 )
                             else:
-                                joined = " — ".join(self.inline(c[0]) for c in r)
-                                body_parts.append(f"<dd>{joined}</dd>")
-                        body_parts.append("</dl></aside>")
-                        html_lines.append("".join(body_parts))
+                                joined = " — ".join(inline(c[0]) for c in r)
+                                write(f"<dd>{joined}</dd>")
+                        write("</dl></aside>\n")
                     else:
-                        table_html = [f"<table class='wikitable'>"]
+                        write("<table class='wikitable'>")
                         if header_html:
-                            table_html.append(header_html)
+                            write(header_html)
                         for r in rows:
-                            table_html.append("<tr>")
+                            write("<tr>")
                             for cell_text, is_header in r:
                                 tag = "th" if is_header else "td"
-                                table_html.append(
-                                    f"<{tag}>{self.inline(cell_text)}</{tag}>"
-                                )
-                            table_html.append("</tr>")
-                        table_html.append("</table>")
-                        html_lines.append("".join(table_html))
+                                write(f"<{tag}>{inline(cell_text)}</{tag}>")
+                            write("</tr>")
+                        write("</table>\n")
                     in_table = False
                 continue
-            if not in_collapse and COLLAPSIBLE_OPEN_RE.search(line):
+            if not in_collapse and "<" in line and COLLAPSIBLE_OPEN_RE.search(line):
                 in_collapse = True
                 collapse_lines = [line]
                 continue
@@ -372,64 +463,64 @@ class WikiConverter:
                 collapse_lines.append(line)
                 if "</div>" in line.lower():
                     block = "\n".join(collapse_lines)
-                    header_match = re.search(
-                        r"<(strong|b|h[1-6])[^>]*>(.*?)</\1>", block, re.IGNORECASE
-                    )
+                    header_match = COLLAPSE_HEADER_RE.search(block)
                     header_html = ""
                     if header_match:
                         header_html = f"<header>{header_match.group(2)}</header>"
-                    inner = re.sub(r"^<div[^>]*>", "", block, flags=re.IGNORECASE)
-                    inner = re.sub(r"</div>\s*$", "", inner, flags=re.IGNORECASE)
-                    converted = self.inline(inner)
-                    html_lines.append(
-                        f"<aside class='collapsible'>{header_html}{converted}</aside>"
+                    inner = DIV_OPEN_RE.sub("", block)
+                    inner = DIV_CLOSE_RE.sub("", inner)
+                    converted = inline(inner)
+                    write(
+                        f"<aside class='collapsible'>{header_html}{converted}</aside>\n"
                     )
                     in_collapse = False
                 continue
             line = strip_categories(line)
             if not line.strip():
                 close_lists(0)
-                html_lines.append("")
+                write("\n")
                 continue
-            m = HEADING_RE.match(line)
-            if m:
+            m = LINE_KIND_RE.match(line)
+            if m is None:
                 close_lists(0)
-                level = len(m.group(1))
-                level = min(level, 6)
-                content = m.group(2).strip()
+                write(f"<p>{inline(line)}</p>\n")
+                continue
+            markers = m.group("heading")
+            if markers:
+                close_lists(0)
+                level = min(len(markers), 6)
+                content = m.group("heading_text").strip()
                 hid = heading_id(content)
-                html_lines.append(
-                    f"<h{level} id='{escape(hid)}'>{escape(content)}</h{level}>"
+                write(
+                    f"<h{level} id='{escape(hid)}'>{escape(content)}</h{level}>\n"
                 )
                 continue
-            m = LIST_ITEM_RE.match(line)
-            if m:
-                markers, body = m.groups()
-                level = len(markers)
-                marker_type = markers[-1]
-                current_depth = len(list_stack)
-                for i in range(current_depth, level):
-                    list_stack.append(marker_type)
-                    html_lines.append(f"<{'ul' if marker_type == '*' else 'ol'}>")
-                if level < current_depth:
-                    close_lists(level)
-                if level and list_stack and list_stack[-1] != marker_type:
-                    close_lists(level - 1)
-                    list_stack.append(marker_type)
-                    html_lines.append(f"<{'ul' if marker_type == '*' else 'ol'}>")
-                body_html = self.inline(body)
-                html_lines.append(f"<li>{body_html}</li>")
-                continue
-            else:
-                close_lists(0)
-            html_lines.append(f"<p>{self.inline(line)}</p>")
+            markers = m.group("list")
+            level = len(markers)
+            marker_type = markers[-1]
+            current_depth = len(list_stack)
+            for i in range(current_depth, level):
+                list_stack.append(marker_type)
+                write(f"<{'ul' if marker_type == '*' else 'ol'}>\n")
+            if level < current_depth:
+                close_lists(level)
+            if level and list_stack and list_stack[-1] != marker_type:
+                close_lists(level - 1)
+                list_stack.append(marker_type)
+                write(f"<{'ul' if marker_type == '*' else 'ol'}>\n")
+            body_html = inline(m.group("list_body"))
+            write(f"<li>{body_html}</li>\n")
         close_lists(0)
-        html = "\n".join(html_lines)
+        html = out.getvalue()[:-1]
         return html, categories
 
     def inline(self, text: str) -> str:
-        def file_sub(match):
-            inside = match.group(1)
+        # Plain prose: nothing below would match, and text outside markup is
+        # passed through unescaped, so return it untouched.
+        if "[" not in text and "''" not in text:
+            return text
+
+        def file_sub(inside: str) -> str:
             parts = inside.split("|")
             file_part = parts[0]
             opts = parts[1:]
@@ -441,13 +532,6 @@ class WikiConverter:
             alt_text: Optional[str] = None
             link_target: Optional[str] = None
             classes: List[str] = ["file-ref"]
-            alignment_tokens = {"left", "right", "center", "none"}
-            frame_tokens = {"thumb", "thumbnail", "frame", "frameless"}
-            known_flags = alignment_tokens | frame_tokens | {"upright"}
-            size_re = re.compile(r"^(\d+)(?:x(\d+))?px$", re.IGNORECASE)
-            upright_re = re.compile(
-                r"^upright(?::?=([0-9]*\.?[0-9]+))?$", re.IGNORECASE
-            )
             technical_indices: Set[int] = set()
             last_explicit_caption_idx: Optional[int] = None
             explicit_size = False
@@ -463,7 +547,7 @@ class WikiConverter:
                     link_target = o[5:].strip()
                     technical_indices.add(idx)
                     continue
-                m = size_re.match(o)
+                m = FILE_SIZE_RE.match(o)
                 if m:
                     try:
                         w = int(m.group(1))
@@ -477,7 +561,7 @@ class WikiConverter:
                         pass
                     technical_indices.add(idx)
                     continue
-                um = upright_re.match(o)
+                um = FILE_UPRIGHT_RE.match(o)
                 if um:
                     factor = um.group(1)
                     try:
@@ -490,15 +574,15 @@ class WikiConverter:
                     technical_indices.add(idx)
                     continue
                 low = o.lower()
-                if low in alignment_tokens:
+                if low in FILE_ALIGN_TOKENS:
                     classes.append(f"align-{low}")
                     technical_indices.add(idx)
                     continue
-                if low in frame_tokens:
+                if low in FILE_FRAME_TOKENS:
                     classes.append(f"mode-{low}")
                     technical_indices.add(idx)
                     continue
-                if low in known_flags:
+                if low in FILE_KNOWN_FLAGS:
                     technical_indices.add(idx)
                     continue
                 last_explicit_caption_idx = idx
@@ -539,7 +623,7 @@ class WikiConverter:
                         internal_anchor = self._link_for_target(
                             link_target_clean, label="__PLACEHOLDER__"
                         )
-                        m_href = re.search(r"href='([^']+)'", internal_anchor)
+                        m_href = HREF_RE.search(internal_anchor)
                         href = m_href.group(1) if m_href else "#"
                         href = href.replace(".html", ".md")
                         md_img = f"[{md_img}]({href})"
@@ -559,7 +643,7 @@ class WikiConverter:
                     internal_anchor = self._link_for_target(
                         link_target_clean, label="__PLACEHOLDER__"
                     )
-                    m = re.search(r"href='([^']+)'", internal_anchor)
+                    m = HREF_RE.search(internal_anchor)
                     href = m.group(1) if m else "#"
                     img_html = f"<a href='{escape(href)}'>{img_html}</a>"
                 else:
@@ -571,11 +655,9 @@ class WikiConverter:
             fig += "</figure>"
             return fig
 
-        text = FILE_LINK_ANY_RE.sub(file_sub, text)
-
-        def link_sub(match):
-            target = match.group(1).strip()
-            label = match.group(2).strip() if match.group(2) else target
+        def link_sub(target: str, label: Optional[str]) -> str:
+            target = target.strip()
+            label = label.strip() if label else target
             if target.lower().startswith("file:"):
                 return label
             if target.startswith("http://") or target.startswith("https://"):
@@ -586,29 +668,72 @@ class WikiConverter:
                 return f"<a href='{escape(slug)}'>{escape(label)}</a>"
             return self._link_for_target(target, label)
 
-        text = LINK_RE.sub(link_sub, text)
-
-        def external_sub(match):
-            url = match.group(1)
-            label = match.group(2).strip() if match.group(2) else url
+        def external_sub(url: str, label: Optional[str]) -> str:
+            label = label.strip() if label else url
             return f"<a href='{escape(url)}'>{escape(label)}</a>"
 
-        text = EXTERNAL_LINK_RE.sub(external_sub, text)
-
-        text = BOLD_ITALIC_RE.sub(
-            lambda m: f"<strong><em>{escape(m.group(1))}</em></strong>", text
-        )
-        text = BOLD_RE.sub(lambda m: f"<strong>{escape(m.group(1))}</strong>", text)
-        text = ITALIC_RE.sub(lambda m: f"<em>{escape(m.group(1))}</em>", text)
+        if "[[" in text:
+            text = FILE_LINK_RE.sub(lambda m: file_sub(m.group(1)), text)
+            text = LINK_RE.sub(lambda m: link_sub(m.group(1), m.group(2)), text)
+        if "[" in text:
+            text = EXTERNAL_LINK_RE.sub(
+                lambda m: external_sub(m.group(1), m.group(2)), text
+            )
+        # Emphasis markup nests (bold inside italic), so it keeps its own
+        # ordered passes; most lines have none at all.
+        if "''" in text:
+            text = BOLD_ITALIC_RE.sub(
+                lambda m: f"<strong><em>{escape(m.group(1))}</em></strong>", text
+            )
+            text = BOLD_RE.sub(lambda m: f"<strong>{escape(m.group(1))}</strong>", text)
+            text = ITALIC_RE.sub(lambda m: f"<em>{escape(m.group(1))}</em>", text)
         return text
 
 
+def _release_page_lxml(elem) -> None:
+    elem.clear()
+    # Every earlier sibling was dropped on the previous page, so at most one
+    # is left (the prior page, or <siteinfo> before the first page).
+    if elem.getprevious() is not None:
+        del elem.getparent()[0]
+
+
+def _iter_pages_lxml(dump_path: Path, keep_revisions: bool):
+    # Only <page> end events reach Python; the page's children are read
+    # with C-level lookups instead of one event per element.
+    context = LET.iterparse(
+        str(dump_path), events=("end",), tag=NS + "page", huge_tree=True
+    )
+    for _, elem in context:
+        page_title = elem.findtext(NS + "title")
+        revs = list(elem.iterchildren(NS + "revision"))
+        if not keep_revisions:
+            revs = revs[-1:]
+        page_revisions = [
+            Revision(
+                id=rev.findtext(NS + "id") or "0",
+                timestamp=rev.findtext(NS + "timestamp") or "",
+                text=rev.findtext(NS + "text") or "",
+            )
+            for rev in revs
+        ]
+        _release_page_lxml(elem)
+        if page_title and page_revisions:
+            yield RawPage(title=page_title, revisions=page_revisions)
+
+
 def iter_pages(dump_path: Path, keep_revisions: bool = False):
+    if _HAVE_LXML:
+        yield from _iter_pages_lxml(dump_path, keep_revisions)
+        return
     context = ET.iterparse(str(dump_path), events=("start", "end"))
     page_title: Optional[str] = None
     page_revisions: List[Revision] = []
+    root = None
     for event, elem in context:
         tag = elem.tag
+        if root is None:
+            root = elem  # first event: start of <mediawiki>
         if event == "start" and tag == NS + "page":
             page_title = None
             page_revisions = []
@@ -616,12 +741,10 @@ def iter_pages(dump_path: Path, keep_revisions: bool = False):
             if tag == NS + "title":
                 page_title = elem.text or ""
             elif tag == NS + "revision":
-                text_el = elem.find(NS + "text")
-                id_el = elem.find(NS + "id")
-                ts_el = elem.find(NS + "timestamp")
-                rev_id = id_el.text if id_el is not None and id_el.text else "0"
-                rev_ts = ts_el.text if ts_el is not None and ts_el.text else ""
-                rev_text = text_el.text if text_el is not None and text_el.text else ""
+                findtext = elem.findtext
+                rev_id = findtext(NS + "id") or "0"
+                rev_ts = findtext(NS + "timestamp") or ""
+                rev_text = findtext(NS + "text") or ""
                 if keep_revisions:
                     page_revisions.append(
                         Revision(id=rev_id, timestamp=rev_ts, text=rev_text)
@@ -630,289 +753,522 @@ def iter_pages(dump_path: Path, keep_revisions: bool = False):
                     page_revisions = [
                         Revision(id=rev_id, timestamp=rev_ts, text=rev_text)
                     ]
+                # Revision holds its own strings; drop the subtree now rather
+                # than keeping every revision body alive until </page>.
+                elem.clear()
             elif tag == NS + "page":
                 if page_title and page_revisions:
                     yield RawPage(title=page_title, revisions=page_revisions)
                 elem.clear()
+                # Cleared pages would otherwise pile up under the root.
+                root.remove(elem)
+
+
+def _iter_titles_lxml(dump_path: Path):
+    context = LET.iterparse(
+        str(dump_path), events=("end",), tag=NS + "page", huge_tree=True
+    )
+    for _, elem in context:
+        page_title = elem.findtext(NS + "title")
+        has_revision = elem.find(NS + "revision") is not None
+        _release_page_lxml(elem)
+        if page_title and has_revision:
+            yield page_title
+
+
+def iter_titles(dump_path: Path):
+    """Yield the titles of the pages iter_pages() yields, in the same order.
+
+    Only titles are read: no Revision (or revision text) is built.
+    """
+    if _HAVE_LXML:
+        yield from _iter_titles_lxml(dump_path)
+        return
+    context = ET.iterparse(str(dump_path), events=("start", "end"))
+    page_title: Optional[str] = None
+    has_revision = False
+    root = None
+    for event, elem in context:
+        tag = elem.tag
+        if root is None:
+            root = elem  # first event: start of <mediawiki>
+        if event == "start" and tag == NS + "page":
+            page_title = None
+            has_revision = False
+        elif event == "end":
+            if tag == NS + "title":
+                page_title = elem.text or ""
+            elif tag == NS + "revision":
+                has_revision = True
+                elem.clear()
+            elif tag == NS + "page":
+                if page_title and has_revision:
+                    yield page_title
+                elem.clear()
+                root.remove(elem)
+
+
+def _md_anchor_sub(m):
+    href = m.group(1)
+    label = m.group(2)
+    if not (href.startswith("http://") or href.startswith("https://")):
+        href = href.replace(".html", ".md")
+    return f"[{label}]({href})"
+
+
+def _md_orphan_file_fragment(m):
+    url = m.group(1)
+    label = "YouTube" if "youtu" in url.lower() else "Link"
+    return f"[{label}]({url})"
+
+
+def _md_pair_tags(body, tokens, kinds):
+    """Pick the tag tokens that form Markdown-convertible pairs.
+
+    Returns a list parallel to ``tokens`` holding each matched token's
+    replacement, or None for tokens left for the final tag strip. An open tag
+    pairs with the nearest following close of its kind, as the non-greedy
+    ``<x>(.*?)</x>`` rewrite would; kinds are paired in MD_PAIR_ORDER and a
+    single-line kind may not span a newline, including the ones an earlier
+    kind's rewrite inserts.
+    """
+    reps = [None] * len(tokens)
+    breaks = [False] * len(tokens)  # token's replacement inserts a newline
+    by_kind = {}
+    for i, (kind, is_open) in enumerate(kinds):
+        if kind == "list":
+            reps[i] = ""
+        else:
+            by_kind.setdefault(kind, ([], []))[0 if is_open else 1].append(i)
+    for kind in MD_PAIR_ORDER:
+        if kind not in by_kind:
+            continue
+        opens, closes = by_kind[kind]
+        multiline = kind in MD_PAIR_MULTILINE
+        j = 0
+        last = -1
+        for oi in opens:
+            if oi < last:
+                continue  # inside the previous pair
+            while j < len(closes) and closes[j] < oi:
+                j += 1
+            if j == len(closes):
+                break
+            ci = closes[j]
+            if not multiline and (
+                body.find("\n", tokens[oi].end(), tokens[ci].start()) >= 0
+                or any(breaks[oi + 1 : ci])
+            ):
+                continue
+            if kind == "a":
+                href = tokens[oi].group("href")
+                if not (href.startswith("http://") or href.startswith("https://")):
+                    href = href.replace(".html", ".md")
+                reps[oi] = "["
+                reps[ci] = f"]({href})"
+            else:
+                reps[oi], reps[ci] = MD_PAIR_MARKUP[kind]
+                breaks[oi] = "\n" in reps[oi]
+                breaks[ci] = "\n" in reps[ci]
+            last = ci
+            j += 1
+    return reps
+
+
+def _md_rewrite_tags_chain(body: str) -> str:
+    for prefix, heading_re in MD_HEADING_RES:
+        body = heading_re.sub(lambda m: prefix + m.group(1) + "\n", body)
+    body = MD_PARAGRAPH_RE.sub(lambda m: m.group(1) + "\n", body)
+    body = MD_LIST_ITEM_RE.sub(lambda m: "- " + m.group(1) + "\n", body)
+    body = MD_LIST_TAG_RE.sub("", body)
+    body = MD_STRONG_RE.sub(lambda m: f"**{m.group(1)}**", body)
+    body = MD_EM_RE.sub(lambda m: f"*{m.group(1)}*", body)
+    return MD_ANCHOR_RE.sub(_md_anchor_sub, body)
+
+
+def _md_rewrite_tags(body: str, tokens) -> str:
+    kinds = []
+    for m in tokens:
+        g = m.lastgroup
+        if g == "h_open" or g == "h_close":
+            kinds.append(("h" + m.group(g), g == "h_open"))
+        elif g == "open" or g == "close":
+            kinds.append((m.group(g), g == "open"))
+        elif g == "list_tag":
+            kinds.append(("list", True))
+        else:
+            kinds.append(("a", g == "a_open"))
+    reps = _md_pair_tags(body, tokens, kinds)
+    parts = []
+    pos = 0
+    for m, rep in zip(tokens, reps):
+        if rep is None:
+            continue
+        parts.append(body[pos : m.start()])
+        parts.append(rep)
+        pos = m.end()
+    parts.append(body[pos:])
+    return "".join(parts)
+
+
+def _html_to_md(body: str) -> str:
+    # Very naive rewrite of the tags convert() emits, in a single scan:
+    # headings (<hN id='...'>text</hN>), paragraphs, list items, bold/italic
+    # and links become Markdown; <ul>/<ol> are dropped.
+    tokens = list(MD_TOKEN_RE.finditer(body))
+    if tokens:
+        find = body.find
+        if any(find("<", m.start() + 1, m.end()) >= 0 for m in tokens):
+            body = _md_rewrite_tags_chain(body)
+        else:
+            body = _md_rewrite_tags(body, tokens)
+    # Fallback: orphaned size|link=...]] fragments (e.g. 60px|link=https://..]] )
+    if "px|link=" in body:
+        body = MD_ORPHAN_FILE_RE.sub(_md_orphan_file_fragment, body)
+    # Remove leftover HTML tags from simple constructs (figure, etc.) crudely.
+    # A "<" after the last ">" cannot start a tag, so the search stops there;
+    # otherwise each such "<" rescans the rest of the body and fails.
+    if "<" in body:
+        end = body.rfind(">") + 1
+        if end:
+            body = MD_TAG_RE.sub("", body[:end]) + body[end:]
+    # Decode HTML entities (e.g., &nbsp; &amp; etc.)
+    body = unescape(body)
+    # Replace non-breaking spaces with regular spaces
+    return body.replace("\u00a0", " ").strip()
+
+
+# Shared skeleton of every HTML file, split around the (escaped) page title so
+# the title can be dropped in without reparsing a format string per file.
+HTML_HEAD_START, HTML_HEAD_END = """<!DOCTYPE html><html><head><meta charset='utf-8'>
+<title>{title}</title>
+<link
+  rel='stylesheet'
+  href='https://cdn.jsdelivr.net/npm/@picocss/pico@2/css/pico.min.css'
+>
+</head><body>""".split("{title}")
+HTML_FOOTER = "<footer>Generated from MediaWiki dump.</footer></body></html>"
+INDEX_NAV = "<nav class='index'><a href='index.html'>&larr; Index</a></nav>"
+# Converted revision bodies kept per page for reuse by identical revisions.
+REVISION_BODY_CACHE = 64
+
+
+def _write_utf8(path: Union[str, Path], text: str) -> None:
+    # One encode and one write per file; output files are never appended to.
+    # The per-page writers pass plain strings: building a Path per file costs
+    # more than the join it wraps.
+    with open(path, "wb") as f:
+        f.write(text.encode("utf-8"))
+
+
+class WriteBehind:
+    """Run _write_utf8 calls on a few threads while the caller keeps converting.
+
+    Every output file is written once, to its own path, so writes need no
+    ordering. At most max_pending writes are queued; the oldest is waited
+    for (and any error raised) before another is added. close() waits for
+    the rest; with raise_errors=False (used while another exception is
+    already propagating) write errors are reported on stderr instead.
+    """
+
+    def __init__(self, workers: int = 4, max_pending: int = 64) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._pending: Deque[Future] = deque()
+        self._max_pending = max_pending
+
+    def write(self, path: str, text: str) -> None:
+        if len(self._pending) >= self._max_pending:
+            self._pending.popleft().result()
+        self._pending.append(self._pool.submit(_write_utf8, path, text))
+
+    def close(self, raise_errors: bool = True) -> None:
+        try:
+            while self._pending:
+                fut = self._pending.popleft()
+                if raise_errors:
+                    fut.result()
+                elif fut.exception() is not None:
+                    print(f"Write failed: {fut.exception()}", file=sys.stderr)
+        finally:
+            self._pool.shutdown()
+
+
+def render_page(
+    converter: WikiConverter,
+    p: Page,
+    outdir: str,
+    output_format: str,
+    dump_old_revisions: bool,
+    write: Callable[[str, str], None] = _write_utf8,
+) -> List[str]:
+    """Convert p (and its older revisions) and write its files with write.
+
+    Returns the page's categories for the category listings.
+    """
+    html_body, p.categories = converter.convert(p.title, p.text)
+    # Listed in the page body and, for Markdown, in the front matter too.
+    cats_sorted = sorted(set(p.categories), key=str.lower)
+    title_html = escape(p.title)
+    if output_format == "html":
+        parts = [
+            HTML_HEAD_START,
+            title_html,
+            HTML_HEAD_END,
+            INDEX_NAV,
+            f"<h1>{title_html}</h1>\n",
+        ]
+        if dump_old_revisions and len(p.revisions) > 1:
+            latest_rev = p.revisions[-1]
+            parts.append(
+                f"<div class='revinfo'>Latest revision {escape(latest_rev.id)} @ {escape(latest_rev.timestamp)} (older revisions under {escape(p.slug)}/)</div>"
+            )
+        parts.append(html_body)
+        if p.categories:
+            parts.append("<section class='categories'><h2>Categories</h2><ul>")
+            for c in cats_sorted:
+                cslug = category_slug(c) + ".html"
+                parts.append(f"<li><a href='{cslug}'>{escape(c)}</a></li>")
+            parts.append("</ul></section>")
+        parts.append(HTML_FOOTER)
+        write(os.path.join(outdir, p.slug + ".html"), "".join(parts))
+        latest_body = html_body
+    else:  # markdown
+        # Basic markdown conversion from already HTML-ish body; we keep headings and paragraphs.
+        # YAML frontmatter for 11ty
+        fm_lines = [
+            "---",
+            f"title: {yaml_quote(p.title)}",
+            f"slug: {yaml_quote(p.slug)}",
+        ]
+        if p.categories:
+            fm_lines.append("categories:")
+            for c in cats_sorted:
+                fm_lines.append(f"  - {yaml_quote(c)}")
+        if dump_old_revisions and len(p.revisions) > 1:
+            latest_rev = p.revisions[-1]
+            fm_lines.append(f"latest_revision: {yaml_quote(latest_rev.id)}")
+            fm_lines.append(
+                f"latest_revision_timestamp: {yaml_quote(latest_rev.timestamp)}"
+            )
+        fm_lines.append("---")
+        # Blocks are joined by blank lines; only the converted body can be
+        # empty (_html_to_md strips it), and an empty body is left out.
+        md_parts = fm_lines
+        if dump_old_revisions and len(p.revisions) > 1:
+            latest_rev = p.revisions[-1]
+            md_parts.append(
+                f"_Latest revision {latest_rev.id} @ {latest_rev.timestamp}_"
+            )
+        md_body = _html_to_md(html_body)
+        if md_body:
+            md_parts.append(md_body)
+        if p.categories:
+            md_parts.append("\n**Categories:** " + ", ".join(cats_sorted))
+        write(os.path.join(outdir, p.slug + ".md"), "\n\n".join(md_parts))
+        latest_body = md_body
+    if dump_old_revisions and len(p.revisions) > 1:
+        rev_dir = os.path.join(outdir, p.slug)
+        os.makedirs(rev_dir, exist_ok=True)
+        older = p.revisions[:-1]
+        # Reverts bring back earlier text verbatim, so each distinct text is
+        # converted once. Keyed by the text itself: a hash alone could collide
+        # and reuse another revision's body. Oldest entries are dropped first.
+        rev_bodies: Dict[str, str] = {p.text: latest_body}
+        for r in older:
+            body = rev_bodies.get(r.text)
+            if body is None:
+                body, _ = converter.convert(p.title, r.text)
+                if output_format != "html":
+                    body = _html_to_md(body)
+                if len(rev_bodies) >= REVISION_BODY_CACHE:
+                    del rev_bodies[next(iter(rev_bodies))]
+                rev_bodies[r.text] = body
+            if output_format == "html":
+                rev_parts = [
+                    HTML_HEAD_START,
+                    f"{title_html} (rev {escape(r.id)})",
+                    HTML_HEAD_END,
+                    f"<nav class='index'><a href='../index.html'>&larr; Index</a> | <a href='../{p.slug}.html'>Latest</a></nav>",
+                    f"<h1>{title_html}</h1>",
+                    f"<div class='revinfo'>Revision {escape(r.id)} @ {escape(r.timestamp)}</div>",
+                    body,
+                    HTML_FOOTER,
+                ]
+                write(os.path.join(rev_dir, r.id + ".html"), "".join(rev_parts))
+            else:
+                rev_md_parts = [
+                    "---",
+                    f'title: {yaml_quote(p.title + " (rev " + r.id + ")")}',
+                    f"page: {yaml_quote(p.title)}",
+                    f"revision_id: {yaml_quote(r.id)}",
+                    f"revision_timestamp: {yaml_quote(r.timestamp)}",
+                    f"slug: {yaml_quote(p.slug)}",
+                    "---",
+                ]
+                rev_md_parts.append(f"# {p.title} (rev {r.id})")
+                rev_md_parts.append(f"_Revision {r.id} @ {r.timestamp}_")
+                if body:
+                    rev_md_parts.append(body)
+                write(os.path.join(rev_dir, r.id + ".md"), "\n\n".join(rev_md_parts))
+    return p.categories
+
+
+# render_page()'s arguments after the page: outdir, output_format and
+# dump_old_revisions.
+RenderArgs = Tuple[str, str, bool]
+
+_worker_converter: Optional[WikiConverter] = None
+_worker_render_args: RenderArgs = ("", "html", False)
+
+
+def _init_worker(page_slugs: Dict[str, str], mode: str, render_args: RenderArgs) -> None:
+    global _worker_converter, _worker_render_args
+    _worker_converter = WikiConverter(mode=mode)
+    _worker_converter.page_slugs = page_slugs
+    _worker_render_args = render_args
+
+
+def _render_one(page: Page) -> List[str]:
+    assert _worker_converter is not None, "_init_worker has not run"
+    outdir, output_format, dump_old_revisions = _worker_render_args
+    return render_page(
+        _worker_converter, page, outdir, output_format, dump_old_revisions
+    )
+
+
+def render_pages(
+    converter: WikiConverter,
+    pages: Iterable[Page],
+    render_args: RenderArgs,
+    jobs: int = 1,
+):
+    """Render pages with render_page(), yielding (page, categories) in order.
+
+    render_args holds render_page()'s arguments after the page. With jobs > 1
+    the pages are rendered in worker processes, each holding a copy of
+    converter's (already complete) page_slugs. pages is consumed in batches
+    so a lazy iterable is never read far ahead of the workers.
+    """
+    if jobs <= 1:
+        # Overlap file writes with converting the next page; with jobs > 1
+        # the worker processes already provide that overlap.
+        outdir, output_format, dump_old_revisions = render_args
+        writer = WriteBehind()
+        try:
+            for p in pages:
+                yield p, render_page(
+                    converter,
+                    p,
+                    outdir,
+                    output_format,
+                    dump_old_revisions,
+                    write=writer.write,
+                )
+        except BaseException:
+            # Keep the conversion error; a pending write error would replace it.
+            writer.close(raise_errors=False)
+            raise
+        writer.close()
+        return
+    pages = iter(pages)
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(converter.page_slugs, converter.mode, render_args),
+    ) as executor:
+        while batch := list(itertools.islice(pages, jobs * 64)):
+            yield from zip(batch, executor.map(_render_one, batch, chunksize=16))
 
 
 def build_pages(
-    pages: List[RawPage],
+    pages: Iterable[RawPage],
     outdir: Path,
     limit: Optional[int] = None,
     media_dir: Optional[Path] = None,
     dump_old_revisions: bool = False,
     output_format: str = "html",
+    jobs: int = 1,
+    titles: Optional[Iterable[str]] = None,
 ):
+    """Write the output files for pages (at most limit of them) to outdir.
+
+    Links may point at any page, so every slug is assigned before the first
+    page is converted. If titles (the titles of pages, in the same order) is
+    given, the slugs come from it and pages is then streamed one page at a
+    time; otherwise pages is read into memory first.
+    """
     outdir.mkdir(parents=True, exist_ok=True)
+    if titles is None:
+        pages = list(itertools.islice(pages, limit))
+        titles = [raw.title for raw in pages]
     used_slugs: set[str] = set()
+    slug_counters: Dict[str, int] = {}
     converter = WikiConverter(mode=output_format)
-    page_objects: List[Page] = []
-    for i, raw in enumerate(pages):
-        if limit is not None and i >= limit:
-            break
-        slug = slugify(raw.title, used_slugs)
-        converter.page_slugs[raw.title] = slug
-        norm = normalize_title(raw.title)
+    slugs: List[str] = []
+    for title in itertools.islice(titles, limit):
+        slug = slugify(title, used_slugs, slug_counters)
+        converter.page_slugs[title] = slug
+        norm = normalize_title(title)
         converter.page_slugs.setdefault(norm, slug)
-        converter.page_slugs.setdefault(raw.title.replace(" ", "_"), slug)
+        converter.page_slugs.setdefault(title.replace(" ", "_"), slug)
         converter.page_slugs.setdefault(norm.replace(" ", "_"), slug)
-        page_objects.append(
-            Page(
-                title=raw.title,
-                text=raw.latest_text,
-                slug=slug,
-                revisions=raw.revisions,
-            )
+        slugs.append(slug)
+    page_objects = (
+        Page(
+            title=raw.title,
+            text=raw.latest_text,
+            slug=slug,
+            revisions=raw.revisions,
         )
+        for slug, raw in zip(slugs, pages)
+    )
 
-    template_head = """<!DOCTYPE html><html><head><meta charset='utf-8'>
-<title>{title}</title>
-<link
-  rel='stylesheet'
-  href='https://cdn.jsdelivr.net/npm/@picocss/pico@2/css/pico.min.css'
->
-</head><body>"""
-    footer = "<footer>Generated from MediaWiki dump.</footer></body></html>"
-
-    category_map: Dict[str, List[Page]] = {}
+    # Category listings only need (title, slug), not the Page and its text.
+    category_map: Dict[str, List[Tuple[str, str]]] = {}
 
-    for p in page_objects:
-        html_body, cats = converter.convert(p.title, p.text)
-        p.categories = cats
+    render_args: RenderArgs = (str(outdir), output_format, dump_old_revisions)
+    # Only (title, slug) of a rendered page is kept, for the index.
+    index_entries: List[Tuple[str, str]] = []
+    for p, cats in render_pages(converter, page_objects, render_args, jobs):
+        index_entries.append((p.title, p.slug))
         for c in cats:
-            category_map.setdefault(c, []).append(p)
-        if output_format == "html":
-            with (outdir / f"{p.slug}.html").open("w", encoding="utf-8") as f:
-                f.write(template_head.format(title=escape(p.title)))
-                f.write(
-                    f"<nav class='index'><a href='index.html'>&larr; Index</a></nav>"
-                )
-                f.write(f"<h1>{escape(p.title)}</h1>\n")
-                if dump_old_revisions and len(p.revisions) > 1:
-                    latest_rev = p.revisions[-1]
-                    f.write(
-                        f"<div class='revinfo'>Latest revision {escape(latest_rev.id)} @ {escape(latest_rev.timestamp)} (older revisions under {escape(p.slug)}/)</div>"
-                    )
-                f.write(html_body)
-                if p.categories:
-                    f.write("<section class='categories'><h2>Categories</h2><ul>")
-                    for c in sorted(set(p.categories), key=str.lower):
-                        cslug = category_slug(c) + ".html"
-                        f.write(f"<li><a href='{cslug}'>{escape(c)}</a></li>")
-                    f.write("</ul></section>")
-                f.write(footer)
-        else:  # markdown
-            # Basic markdown conversion from already HTML-ish body; we keep headings and paragraphs.
-            # YAML frontmatter for 11ty
-            fm_lines = [
-                "---",
-                f"title: {yaml_quote(p.title)}",
-                f"slug: {yaml_quote(p.slug)}",
-            ]
-            if p.categories:
-                fm_lines.append("categories:")
-                for c in sorted(set(p.categories), key=str.lower):
-                    fm_lines.append(f"  - {yaml_quote(c)}")
-            if dump_old_revisions and len(p.revisions) > 1:
-                latest_rev = p.revisions[-1]
-                fm_lines.append(f"latest_revision: {yaml_quote(latest_rev.id)}")
-                fm_lines.append(
-                    f"latest_revision_timestamp: {yaml_quote(latest_rev.timestamp)}"
-                )
-            fm_lines.append("---")
-            md_lines: List[str] = []
-            if dump_old_revisions and len(p.revisions) > 1:
-                latest_rev = p.revisions[-1]
-                md_lines.append(
-                    f"_Latest revision {latest_rev.id} @ {latest_rev.timestamp}_"
-                )
-            # Very naive replacements for block tags
-            body_for_md = html_body
-            # Replace headings already produced as <hN id='...'>text</hN>
-            for n in range(6, 0, -1):
-                body_for_md = re.sub(
-                    rf"<h{n}[^>]*>(.*?)</h{n}>",
-                    lambda m: "\n" + ("#" * n) + " " + m.group(1) + "\n",
-                    body_for_md,
-                )
-            body_for_md = re.sub(
-                r"<p>(.*?)</p>",
-                lambda m: m.group(1) + "\n",
-                body_for_md,
-                flags=re.DOTALL,
-            )
-            body_for_md = re.sub(
-                r"<li>(.*?)</li>", lambda m: "- " + m.group(1) + "\n", body_for_md
-            )
-            body_for_md = re.sub(r"</?(ul|ol)>", "", body_for_md)
-            body_for_md = re.sub(
-                r"<strong>(.*?)</strong>", lambda m: f"**{m.group(1)}**", body_for_md
-            )
-            body_for_md = re.sub(
-                r"<em>(.*?)</em>", lambda m: f"*{m.group(1)}*", body_for_md
-            )
-
-            def _anchor_sub(m):
-                href = m.group(1)
-                label = m.group(2)
-                if not (href.startswith("http://") or href.startswith("https://")):
-                    href = href.replace(".html", ".md")
-                return f"[{label}]({href})"
-
-            body_for_md = re.sub(
-                r"<a\s+[^>]*href=['\"]([^'\"]+)['\"][^>]*>(.*?)</a>",
-                _anchor_sub,
-                body_for_md,
-                flags=re.IGNORECASE | re.DOTALL,
-            )
-
-            # Fallback: orphaned size|link=...]] fragments (e.g. 60px|link=https://..]] )
-            def _orphan_file_fragment(m):
-                url = m.group(1)
-                label = "YouTube" if "youtu" in url.lower() else "Link"
-                return f"[{label}]({url})"
-
-            body_for_md = re.sub(
-                r"\b\d+px\|link=(https?://[^\]]+)]\]",
-                _orphan_file_fragment,
-                body_for_md,
-            )
-            # Remove leftover HTML tags from simple constructs (figure, etc.) crudely
-            body_for_md = re.sub(r"<[^>]+>", "", body_for_md)
-            # Decode HTML entities (e.g., &nbsp; &amp; etc.)
-            body_for_md = unescape(body_for_md)
-            # Replace non-breaking spaces with regular spaces
-            body_for_md = body_for_md.replace("\u00a0", " ")
-            md_lines.append(body_for_md.strip())
-            if p.categories:
-                md_lines.append(
-                    "\n**Categories:** "
-                    + ", ".join(sorted(set(p.categories), key=str.lower))
-                )
-            final_md_parts = fm_lines + [l for l in md_lines if l.strip()]
-            (outdir / f"{p.slug}.md").write_text(
-                "\n\n".join(final_md_parts), encoding="utf-8"
-            )
-        if dump_old_revisions and len(p.revisions) > 1:
-            rev_dir = outdir / p.slug
-            rev_dir.mkdir(parents=True, exist_ok=True)
-            older = p.revisions[:-1]
-            for r in older:
-                html_rev, _ = converter.convert(p.title, r.text)
-                if output_format == "html":
-                    with (rev_dir / f"{r.id}.html").open("w", encoding="utf-8") as rf:
-                        rf.write(
-                            template_head.format(
-                                title=f"{escape(p.title)} (rev {escape(r.id)})"
-                            )
-                        )
-                        rf.write(
-                            f"<nav class='index'><a href='../index.html'>&larr; Index</a> | <a href='../{p.slug}.html'>Latest</a></nav>"
-                        )
-                        rf.write(f"<h1>{escape(p.title)}</h1>")
-                        rf.write(
-                            f"<div class='revinfo'>Revision {escape(r.id)} @ {escape(r.timestamp)}</div>"
-                        )
-                        rf.write(html_rev)
-                        rf.write(footer)
-                else:
-                    fm_rev = [
-                        "---",
-                        f'title: {yaml_quote(p.title + " (rev " + r.id + ")")}',
-                        f"page: {yaml_quote(p.title)}",
-                        f"revision_id: {yaml_quote(r.id)}",
-                        f"revision_timestamp: {yaml_quote(r.timestamp)}",
-                        f"slug: {yaml_quote(p.slug)}",
-                        "---",
-                    ]
-                    rev_md_lines = fm_rev + [
-                        f"# {p.title} (rev {r.id})",
-                        f"_Revision {r.id} @ {r.timestamp}_",
-                    ]
-                    body_for_md = html_rev
-                    for n in range(6, 0, -1):
-                        body_for_md = re.sub(
-                            rf"<h{n}[^>]*>(.*?)</h{n}>",
-                            lambda m: "\n" + ("#" * n) + " " + m.group(1) + "\n",
-                            body_for_md,
-                        )
-                    body_for_md = re.sub(
-                        r"<p>(.*?)</p>",
-                        lambda m: m.group(1) + "\n",
-                        body_for_md,
-                        flags=re.DOTALL,
-                    )
-                    body_for_md = re.sub(
-                        r"<li>(.*?)</li>",
-                        lambda m: "- " + m.group(1) + "\n",
-                        body_for_md,
-                    )
-                    body_for_md = re.sub(r"</?(ul|ol)>", "", body_for_md)
-                    body_for_md = re.sub(
-                        r"<strong>(.*?)</strong>",
-                        lambda m: f"**{m.group(1)}**",
-                        body_for_md,
-                    )
-                    body_for_md = re.sub(
-                        r"<em>(.*?)</em>", lambda m: f"*{m.group(1)}*", body_for_md
-                    )
-
-                    def _anchor_sub_rev(m):
-                        href = m.group(1)
-                        label = m.group(2)
-                        if not (
-                            href.startswith("http://") or href.startswith("https://")
-                        ):
-                            href = href.replace(".html", ".md")
-                        return f"[{label}]({href})"
-
-                    body_for_md = re.sub(
-                        r"<a\s+[^>]*href=['\"]([^'\"]+)['\"][^>]*>(.*?)</a>",
-                        _anchor_sub_rev,
-                        body_for_md,
-                        flags=re.IGNORECASE | re.DOTALL,
-                    )
-
-                    # Orphaned size|link fragments in revisions
-                    def _orphan_file_fragment_rev(m):
-                        url = m.group(1)
-                        label = "YouTube" if "youtu" in url.lower() else "Link"
-                        return f"[{label}]({url})"
-
-                    body_for_md = re.sub(
-                        r"\b\d+px\|link=(https?://[^\]]+)]\]",
-                        _orphan_file_fragment_rev,
-                        body_for_md,
-                    )
-                    body_for_md = re.sub(r"<[^>]+>", "", body_for_md)
-                    body_for_md = unescape(body_for_md)
-                    body_for_md = body_for_md.replace("\u00a0", " ")
-                    rev_md_lines.append(body_for_md.strip())
-                    (rev_dir / f"{r.id}.md").write_text(
-                        "\n\n".join([l for l in rev_md_lines if l.strip()]),
-                        encoding="utf-8",
-                    )
-
-    for cat, plist in sorted(category_map.items(), key=lambda kv: kv[0].lower()):
+            category_map.setdefault(c, []).append((p.title, p.slug))
+
+    # One sorted name list serves the category pages and the index listing.
+    cat_names = sorted(category_map, key=str.lower)
+    # Category files avoid page slugs only (used_slugs is not extended here),
+    # so the free name depends on the slug stem alone: resolve each stem once.
+    # slugify's counters already know which -N suffixes the pages took.
+    category_files: Dict[str, str] = {}
+    for cat in cat_names:
+        plist = category_map[cat]
         cslug = category_slug(cat)
-        final_slug = cslug
-        i = 2
-        while final_slug in used_slugs:
-            final_slug = f"{cslug}-{i}"
-            i += 1
+        final_slug = category_files.get(cslug)
+        if final_slug is None:
+            final_slug = cslug
+            if final_slug in used_slugs:
+                i = slug_counters.get(cslug, 2)
+                final_slug = f"{cslug}-{i}"
+                while final_slug in used_slugs:
+                    i += 1
+                    final_slug = f"{cslug}-{i}"
+            category_files[cslug] = final_slug
         if output_format == "html":
             cat_filename = final_slug + ".html"
-            with (outdir / cat_filename).open("w", encoding="utf-8") as f:
-                f.write(template_head.format(title=f"Category: {escape(cat)}"))
-                f.write(
-                    f"<nav class='index'><a href='index.html'>&larr; Index</a></nav>"
-                )
-                f.write(f"<h1>Category: {escape(cat)}</h1><ul>")
-                for p in sorted(plist, key=lambda x: x.title.lower()):
-                    f.write(f"<li><a href='{p.slug}.html'>{escape(p.title)}</a></li>")
-                f.write("</ul>")
-                f.write(footer)
+            parts = [
+                HTML_HEAD_START,
+                f"Category: {escape(cat)}",
+                HTML_HEAD_END,
+                INDEX_NAV,
+                f"<h1>Category: {escape(cat)}</h1><ul>",
+            ]
+            parts.extend(
+                f"<li><a href='{slug}.html'>{escape(title)}</a></li>"
+                for title, slug in sorted(plist, key=lambda x: x[0].lower())
+            )
+            parts.append("</ul>")
+            parts.append(HTML_FOOTER)
+            _write_utf8(outdir / cat_filename, "".join(parts))
         else:
             cat_filename = final_slug + ".md"
             lines = [
@@ -925,25 +1281,28 @@ def build_pages(
                 "## Pages",
                 "",
             ]
-            for p in sorted(plist, key=lambda x: x.title.lower()):
-                lines.append(f"- {p.title} ({p.slug}.md)")
-            (outdir / cat_filename).write_text("\n".join(lines), encoding="utf-8")
+            lines.extend(
+                f"- {title} ({slug}.md)"
+                for title, slug in sorted(plist, key=lambda x: x[0].lower())
+            )
+            _write_utf8(outdir / cat_filename, "\n".join(lines))
 
     if output_format == "html":
-        with (outdir / "index.html").open("w", encoding="utf-8") as f:
-            f.write(template_head.format(title="Index"))
-            f.write("<h1>Pages</h1><ul>")
-            for p in sorted(page_objects, key=lambda x: x.title.lower()):
-                f.write(f"<li><a href='{p.slug}.html'>{escape(p.title)}</a></li>")
-            f.write("</ul>")
-            if category_map:
-                f.write("<h2>Categories</h2><ul>")
-                for cat in sorted(category_map.keys(), key=str.lower):
-                    f.write(
-                        f"<li><a href='{category_slug(cat)}.html'>{escape(cat)}</a></li>"
-                    )
-                f.write("</ul>")
-            f.write(footer)
+        parts = [HTML_HEAD_START, "Index", HTML_HEAD_END, "<h1>Pages</h1><ul>"]
+        parts.extend(
+            f"<li><a href='{slug}.html'>{escape(title)}</a></li>"
+            for title, slug in sorted(index_entries, key=lambda x: x[0].lower())
+        )
+        parts.append("</ul>")
+        if category_map:
+            parts.append("<h2>Categories</h2><ul>")
+            parts.extend(
+                f"<li><a href='{category_slug(cat)}.html'>{escape(cat)}</a></li>"
+                for cat in cat_names
+            )
+            parts.append("</ul>")
+        parts.append(HTML_FOOTER)
+        _write_utf8(outdir / "index.html", "".join(parts))
     else:
         lines = [
             "---",
@@ -952,13 +1311,14 @@ def build_pages(
             "# Pages",
             "",
         ]
-        for p in sorted(page_objects, key=lambda x: x.title.lower()):
-            lines.append(f"- {p.title} ({p.slug}.md)")
+        lines.extend(
+            f"- {title} ({slug}.md)"
+            for title, slug in sorted(index_entries, key=lambda x: x[0].lower())
+        )
         if category_map:
             lines.append("\n## Categories\n")
-            for cat in sorted(category_map.keys(), key=str.lower):
-                lines.append(f"- {cat} ({category_slug(cat)}.md)")
-        (outdir / "index.md").write_text("\n".join(lines), encoding="utf-8")
+            lines.extend(f"- {cat} ({category_slug(cat)}.md)" for cat in cat_names)
+        _write_utf8(outdir / "index.md", "\n".join(lines))
 
 
 def main(argv=None):
@@ -983,7 +1343,17 @@ def main(argv=None):
         default="html",
         help="Output format (html or markdown)",
     )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Convert and write pages in N worker processes",
+    )
     args = ap.parse_args(argv)
+    if args.jobs < 1:
+        ap.error("--jobs must be >= 1")
+    if args.limit is not None and args.limit < 0:
+        ap.error("--limit must be >= 0")
 
     dump_path = Path(args.dump)
     if not dump_path.exists():
@@ -992,14 +1362,17 @@ def main(argv=None):
     outdir = Path(args.out)
     media_dir = Path(args.media_dir) if args.media_dir else None
 
-    pages = list(iter_pages(dump_path, keep_revisions=args.dump_old_revisions))
+    # Slugs come from a first pass over the dump that keeps only titles; the
+    # pages are then streamed through conversion instead of held in memory.
     build_pages(
-        pages,
+        iter_pages(dump_path, keep_revisions=args.dump_old_revisions),
         outdir,
         limit=args.limit,
         media_dir=media_dir,
         dump_old_revisions=args.dump_old_revisions,
         output_format=args.format,
+        jobs=args.jobs,
+        titles=iter_titles(dump_path),
     )
     if args.format == "html":
         print(f"Done. HTML written to {outdir}")